@@ -3,8 +3,9 @@ Azure AI Search Index Manager
 Purpose: Create and manage search indexes with hybrid search
 """
 
+import hashlib
 from typing import List, Dict
-from azure.search.documents import SearchClient
+from azure.search.documents import SearchClient, SearchIndexingBufferedSender
 from azure.search.documents.indexes import SearchIndexClient
 from azure.search.documents.indexes.models import (
     SearchIndex,
@@ -13,14 +14,18 @@ from azure.search.documents.indexes.models import (
     VectorSearch,
     VectorSearchProfile,
     HnswAlgorithmConfiguration,
+    ScalarQuantizationCompression,
+    RescoringOptions,
+    VectorSearchCompressionRescoreStorageMethod,
     SimpleField,
     SearchableField
 )
 from azure.core.credentials import AzureKeyCredential
 from src.utils.logger import get_logger
-from src.utils.config import settings
+from src.utils.config import get_settings
 
 logger = get_logger(__name__)
+settings = get_settings()
 
 
 class AzureSearchManager:
@@ -38,6 +43,7 @@ class AzureSearchManager:
         """Initialize Azure AI Search clients"""
 
         credential = AzureKeyCredential(settings.azure_search_admin_key)
+        self.credential = credential
 
         # WHY: SearchIndexClient creates/manages indexes
         self.index_client = SearchIndexClient(
@@ -74,19 +80,35 @@ class AzureSearchManager:
             profiles=[
                 VectorSearchProfile(
                     name="vector-profile",
-                    algorithm_configuration_name="hnsw-config"
+                    algorithm_configuration_name="hnsw-config",
+                    compression_name="sq-int8"
                 )
             ],
             algorithms=[
                 HnswAlgorithmConfiguration(
                     name="hnsw-config",
                     parameters={
-                        "m": 4,              # WHY: Connections per layer (balance speed/accuracy)
-                        "efConstruction": 400, # WHY: Build quality (higher = better but slower)
-                        "efSearch": 500,      # WHY: Search quality (higher = better but slower)
-                        "metric": "cosine"    # WHY: Similarity metric for embeddings
+                        "m": settings.hnsw_m,                            # WHY: Connections per layer - 16 suits 1536-dim embeddings
+                        "efConstruction": settings.hnsw_ef_construction, # WHY: Build quality (higher = better but slower)
+                        "efSearch": settings.hnsw_ef_search,             # WHY: Search quality vs per-query latency
+                        "metric": "cosine"                               # WHY: Similarity metric for embeddings
                     }
                 )
+            ],
+            # WHY: int8 scalar quantization stores 1 byte per dimension instead of 4,
+            #      so each HNSW hop moves a quarter of the memory; rescoring the
+            #      oversampled candidates on full-precision vectors recovers recall
+            compressions=[
+                ScalarQuantizationCompression(
+                    compression_name="sq-int8",
+                    rescoring_options=RescoringOptions(
+                        enable_rescoring=True,
+                        default_oversampling=10,
+                        rescore_storage_method=VectorSearchCompressionRescoreStorageMethod.PRESERVE_ORIGINALS
+                    ),
+                    # WHY: Only for Matryoshka models (text-embedding-3-*); None keeps all dimensions
+                    truncation_dimension=settings.embedding_truncation_dimension
+                )
             ]
         )
 
@@ -154,36 +176,68 @@ class AzureSearchManager:
         """
 
         # WHY: Convert to Azure Search document format
+        #      Metadata is looked up once per doc and append is bound locally
         search_documents = []
-        for idx, doc in enumerate(documents):
-            search_doc = {
-                "id": f"doc_{idx}",  # WHY: Unique ID required by Azure Search
-                "content": doc["page_content"],
-                "embedding": doc["embedding"],
-                "source_file": doc["metadata"].get("source_file", ""),
-                "page": doc["metadata"].get("page", 0),
-                "chunk": doc["metadata"].get("chunk", 0)
-            }
-            search_documents.append(search_doc)
-
-        # WHY: Upload in batches (Azure Search limit: 1000 docs per batch)
-        batch_size = 100
-        total_batches = (len(search_documents) + batch_size - 1) // batch_size
-
-        logger.info(f"Uploading {len(search_documents)} documents in {total_batches} batches...")
-
-        for i in range(0, len(search_documents), batch_size):
-            batch = search_documents[i:i + batch_size]
-
-            try:
-                result = self.search_client.upload_documents(documents=batch)
-                logger.info(f"  Batch {i//batch_size + 1}/{total_batches} complete")
-
-            except Exception as e:
-                logger.error(f"Batch {i//batch_size + 1} failed: {e}")
-                continue
+        append = search_documents.append
+
+        for doc in documents:
+            content = doc["page_content"]
+            metadata = doc["metadata"]
+            embedding = doc["embedding"]
+            source_file = metadata.get("source_file", "")
+            page = metadata.get("page", 0)
+            chunk = metadata.get("chunk", 0)
+
+            append({
+                "id": self._document_id(source_file, page, chunk, content),
+                "content": content,
+                # WHY: Embeddings are float32 arrays in memory; JSON needs a list
+                "embedding": embedding.tolist() if hasattr(embedding, "tolist") else embedding,
+                "source_file": source_file,
+                "page": page,
+                "chunk": chunk
+            })
+
+        logger.info(f"Uploading {len(search_documents)} documents...")
+
+        succeeded = 0
+        failed = 0
+
+        def on_progress(action):
+            nonlocal succeeded
+            succeeded += 1
+
+        def on_error(action):
+            nonlocal failed
+            failed += 1
+            logger.error(f"Failed to index document {action.additional_properties.get('id')}")
+
+        # WHY: The buffered sender batches actions, splits batches that are too
+        #      large, and retries throttled (429/503) requests with backoff
+        with SearchIndexingBufferedSender(
+            endpoint=settings.azure_search_endpoint,
+            index_name=self.index_name,
+            credential=self.credential,
+            initial_batch_action_count=settings.index_batch_size,
+            on_progress=on_progress,
+            on_error=on_error
+        ) as sender:
+            sender.upload_documents(documents=search_documents)
+
+        logger.info(f"Uploaded {succeeded} documents ({failed} failed)")
+
+    @staticmethod
+    def _document_id(source_file: str, page: int, chunk: int, content: str) -> str:
+        """
+        Deterministic document key
 
-        logger.info(f"Uploaded {len(search_documents)} documents")
+        WHY: Stable IDs make re-uploads idempotent (merge instead of duplicate)
+             and let unchanged chunks be skipped on incremental re-indexing.
+             Location is hashed with content so repeated boilerplate on
+             different pages stays distinct.
+        """
+        key = f"{source_file}|{page}|{chunk}|{content}".encode("utf-8")
+        return hashlib.blake2b(key, digest_size=12).hexdigest()
 
     def get_index_stats(self) -> Dict:
         """Get index statistics"""
@@ -202,32 +256,29 @@ if __name__ == "__main__":
     from src.azure_blob_loader import AzureBlobDocumentLoader
     from src.embedding_pipeline import EmbeddingPipeline
 
-    print("\n Loading and embedding documents...")
-
-    # Load documents
-    loader = AzureBlobDocumentLoader()
-    documents = loader.load_documents()
-
-    if not documents:
-        print("No documents found")
-        exit(1)
-
-    # Generate embeddings
-    pipeline = EmbeddingPipeline()
-    embedded_docs = pipeline.process_documents(documents)
-
-    print(f"Prepared {len(embedded_docs)} embedded documents")
+    print("\n Loading, embedding and uploading documents...")
 
     # Create search index
+    # WHY: Index must exist before the first streamed batch is uploaded
     print("\n Creating Azure AI Search index...")
     manager = AzureSearchManager()
-
-    # Create index
     manager.create_index()
 
-    # Upload documents
-    print("\n Uploading documents to search index...")
-    manager.upload_documents(embedded_docs)
+    # WHY: Stream loader -> chunker -> embedder -> uploader so uploads start
+    #      while later PDFs are still downloading and embedding
+    loader = AzureBlobDocumentLoader()
+    pipeline = EmbeddingPipeline()
+
+    total_uploaded = 0
+    for embedded_docs in pipeline.process_documents_stream(loader.iter_documents()):
+        manager.upload_documents(embedded_docs)
+        total_uploaded += len(embedded_docs)
+
+    if not total_uploaded:
+        print("No documents found")
+        exit(1)
+
+    print(f"Uploaded {total_uploaded} embedded documents")
 
     # Get stats
     stats = manager.get_index_stats()
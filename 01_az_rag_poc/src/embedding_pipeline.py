@@ -3,13 +3,27 @@ Azure OpenAI Embedding Pipeline
 Purpose: Chunk documents and generate embeddings for semantic search
 """
 
-from typing import List, Dict
+import asyncio
+import hashlib
+import os
+import queue
+import re
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Iterable, Iterator, List, Dict, Optional
+import numpy as np
 import tiktoken
-from openai import AzureOpenAI
+from openai import AzureOpenAI, AsyncAzureOpenAI
 from src.utils.logger import get_logger
-from src.utils.config import settings
+from src.utils.config import get_settings
 
 logger = get_logger(__name__)
+settings = get_settings()
+
+# WHY: Sentence terminators (incl. ellipsis and CJK full-width forms) and newlines
+#      are all acceptable split points; compiled once at import
+BOUNDARY_PATTERN = re.compile(r"[.!?\u2026\u3002\uff01\uff1f\n]")
 
 
 class TextChunker:
@@ -20,6 +34,8 @@ class TextChunker:
          Chunking also improves retrieval precision - smaller chunks = more specific matches
     """
 
+    _encoding: Optional["tiktoken.Encoding"] = None
+
     def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
         """
         Args:
@@ -30,7 +46,11 @@ class TextChunker:
         self.chunk_overlap = chunk_overlap
 
         # WHY: tiktoken counts *tokens* not characters - important for OpenAI models
-        self.encoding = tiktoken.encoding_for_model("text-embedding-ada-002")
+        #      cl100k_base is ada-002's encoding; naming it skips the model registry lookup
+        #      Built once per process and shared by every chunker instance
+        if TextChunker._encoding is None:
+            TextChunker._encoding = tiktoken.get_encoding("cl100k_base")
+        self.encoding = TextChunker._encoding
 
         logger.info(f"TextChunker initialized")
         logger.info(f"  Chunk size: {chunk_size} chars")
@@ -42,33 +62,45 @@ class TextChunker:
         if len(text) <= self.chunk_size:
             return [text]
 
+        # WHY: One regex pass finds every boundary; each window then bisects
+        #      instead of re-scanning the text with two rfind calls
+        boundaries = self._boundary_offsets(text)
+
+        # WHY: Each window's start depends on where the previous one was cut,
+        #      so the loop stays sequential - but every step is now O(log B)
+        #      with locals bound once instead of attribute/len lookups per pass
+        text_len = len(text)
+        chunk_size = self.chunk_size
+        chunk_overlap = self.chunk_overlap
         chunks = []
+        append = chunks.append
         start = 0
 
-        while start < len(text):
-            end = start + self.chunk_size
+        while start < text_len:
+            end = start + chunk_size
 
-            # Find last period or newline to avoid cutting sentences
-            if end < len(text):
-                last_period = text.rfind('.', start, end)
-                last_newline = text.rfind('\n', start, end)
-                if last_period > start or last_newline > start:
-                    end = max(last_period, last_newline) + 1
+            # Find last sentence/paragraph boundary to avoid cutting sentences
+            if end < text_len:
+                idx = bisect_right(boundaries, end) - 1
+                if idx >= 0 and boundaries[idx] > start + 1:
+                    end = boundaries[idx]
 
             chunk = text[start:end].strip()
 
             if chunk:
-                chunks.append(chunk)
+                append(chunk)
 
             # Move start position with overlap
-            start = end - self.chunk_overlap
-
-            # Avoid infinite loops
-            if start >= len(text):
-                break
+            # WHY: Always advance - a boundary just after start would otherwise
+            #      pull the next window back onto the same cut forever
+            start = max(end - chunk_overlap, start + 1)
 
         return chunks
 
+    def _boundary_offsets(self, text: str) -> List[int]:
+        """Offsets just past every boundary character, in ascending order"""
+        return [match.end() for match in BOUNDARY_PATTERN.finditer(text)]
+
     def chunk_documents(self, documents: List[Dict]) -> List[Dict]:
         """
         Split documents into chunks while preserving metadata
@@ -82,31 +114,54 @@ class TextChunker:
         chunked_docs = []
 
         for doc in documents:
-            text = doc["page_content"]
-            metadata = doc["metadata"]
-
-            # Split into chunks
-            chunks = self.split_text(text)
-
-            # Create document for each chunk
-            for chunk_idx, chunk in enumerate(chunks):
-                chunked_doc = {
-                    "page_content": chunk,
-                    "metadata": {
-                        **metadata,
-                        "chunk": chunk_idx,
-                        "total_chunks": len(chunks)
-                    }
-                }
-                chunked_docs.append(chunked_doc)
+            chunked_docs.extend(self.chunk_document(doc))
 
         logger.info(f"Chunked {len(documents)} docs into {len(chunked_docs)} chunks")
         return chunked_docs
 
+    def chunk_document(self, doc: Dict) -> List[Dict]:
+        """Split a single document into chunks while preserving metadata"""
+        text = doc["page_content"]
+        metadata = doc["metadata"]
+
+        # WHY: Short pages are the common case - skip split_text and the
+        #      dict splat, and set the two chunk keys on a plain copy
+        if len(text) <= self.chunk_size:
+            chunk_metadata = metadata.copy()
+            chunk_metadata["chunk"] = 0
+            chunk_metadata["total_chunks"] = 1
+            return [{"page_content": text, "metadata": chunk_metadata}]
+
+        # Split into chunks
+        chunks = self.split_text(text)
+
+        # Create document for each chunk
+        return [
+            {
+                "page_content": chunk,
+                "metadata": {
+                    **metadata,
+                    "chunk": chunk_idx,
+                    "total_chunks": len(chunks)
+                }
+            }
+            for chunk_idx, chunk in enumerate(chunks)
+        ]
+
     def count_tokens(self, text: str) -> int:
         """Count tokens in text"""
         return len(self.encoding.encode(text))
 
+    def count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """
+        Count tokens for many texts in one call
+
+        WHY: encode_ordinary_batch releases the GIL and tokenizes across threads,
+             avoiding per-call overhead when sizing a whole corpus
+        """
+        token_ids = self.encoding.encode_ordinary_batch(texts, num_threads=os.cpu_count() or 1)
+        return [len(ids) for ids in token_ids]
+
 
 class AzureOpenAIEmbedder:
     """
@@ -130,6 +185,11 @@ class AzureOpenAIEmbedder:
 
         self.deployment = settings.azure_openai_embedding_deployment
 
+        # WHY: Content-hash -> embedding LRU; repeated headers, footers and
+        #      disclaimers are embedded (and billed) only once. Bounded by
+        #      settings.embedding_cache_size so memory doesn't grow with the corpus
+        self._cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+
         logger.info(f"AzureOpenAIEmbedder initialized")
         logger.info(f"  Endpoint: {settings.azure_openai_endpoint}")
         logger.info(f"  Deployment: {self.deployment}")
@@ -155,43 +215,106 @@ class AzureOpenAIEmbedder:
         WHY: Batch processing is more efficient but Azure OpenAI has limits:
              - Max 16 texts per batch
              - Max 8191 tokens per text
+             Batches are sent concurrently so the embed phase costs
+             ~ceil(batches / concurrency) round-trips instead of one per batch
         """
-        embedded_docs = []
+        # WHY: Only request embeddings for content not seen before
+        hashes = [self._content_hash(doc["page_content"]) for doc in documents]
+
+        # WHY: This call's embeddings, held locally - the LRU may evict them
+        #      before fan-out when a call has more unique chunks than it holds
+        embeddings: Dict[bytes, np.ndarray] = {}
+        pending = {}
+        for idx, content_hash in enumerate(hashes):
+            if content_hash in embeddings or content_hash in pending:
+                continue
+            cached = self._cache.get(content_hash)
+            if cached is not None:
+                self._cache.move_to_end(content_hash)
+                embeddings[content_hash] = cached
+            else:
+                pending[content_hash] = idx
+
+        unique_docs = [documents[idx] for idx in pending.values()]
+        unique_hashes = list(pending.keys())
 
         # WHY: Process in batches of 16 (Azure OpenAI limit)
         batch_size = 16
-        total_batches = (len(documents) + batch_size - 1) // batch_size
-
-        logger.info(f"Embedding {len(documents)} documents in {total_batches} batches...")
+        batches = [unique_docs[i:i + batch_size] for i in range(0, len(unique_docs), batch_size)]
 
-        for i in range(0, len(documents), batch_size):
-            batch = documents[i:i + batch_size]
-            batch_texts = [doc["page_content"] for doc in batch]
+        logger.info(
+            f"Embedding {len(documents)} documents "
+            f"({len(unique_docs)} new) in {len(batches)} batches..."
+        )
 
-            try:
-                # Generate embeddings for batch
-                response = self.client.embeddings.create(
-                    input=batch_texts,
-                    model=self.deployment
-                )
-
-                # Add embeddings to documents
-                for doc, embedding_data in zip(batch, response.data):
-                    embedded_doc = {
-                        **doc,
-                        "embedding": embedding_data.embedding
-                    }
-                    embedded_docs.append(embedded_doc)
-
-                logger.info(f"  Batch {i//batch_size + 1}/{total_batches} complete")
+        results = asyncio.run(self._embed_batches(batches)) if batches else []
 
-            except Exception as e:
-                logger.error(f"Batch {i//batch_size + 1} failed: {e}")
+        # Populate cache in batch order
+        for batch_num, result in enumerate(results):
+            if isinstance(result, Exception):
+                logger.error(f"Batch {batch_num + 1} failed: {result}")
                 continue
 
+            # WHY: float32 rows take 4 bytes per dimension vs ~32 for boxed Python floats
+            matrix = np.asarray([e.embedding for e in result.data], dtype=np.float32)
+
+            batch_hashes = unique_hashes[batch_num * batch_size:(batch_num + 1) * batch_size]
+            for content_hash, embedding in zip(batch_hashes, matrix):
+                embeddings[content_hash] = embedding
+                self._cache_embedding(content_hash, embedding)
+
+        # Fan embeddings back out to every document (skipping failed batches)
+        embedded_docs = [
+            {**doc, "embedding": embeddings[content_hash]}
+            for doc, content_hash in zip(documents, hashes)
+            if content_hash in embeddings
+        ]
+
         logger.info(f"Generated {len(embedded_docs)} embeddings")
         return embedded_docs
 
+    def _cache_embedding(self, content_hash: bytes, embedding: np.ndarray):
+        """Insert into the LRU, evicting the least recently used entries"""
+        self._cache[content_hash] = embedding
+        while len(self._cache) > settings.embedding_cache_size:
+            self._cache.popitem(last=False)
+
+    @staticmethod
+    def _content_hash(text: str) -> bytes:
+        """Stable 128-bit digest of chunk text"""
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    async def _embed_batches(self, batches: List[List[Dict]]) -> List:
+        """
+        Embed all batches with a bounded number of requests in flight
+
+        WHY: The async client is scoped to this event loop - httpx connections
+             cannot be reused across separate asyncio.run() calls
+        """
+        semaphore = asyncio.Semaphore(settings.embed_concurrency)
+        total_batches = len(batches)
+
+        async with AsyncAzureOpenAI(
+            api_key=settings.azure_openai_api_key,
+            api_version=settings.azure_openai_api_version,
+            azure_endpoint=settings.azure_openai_endpoint,
+            max_retries=5  # WHY: SDK backs off exponentially on 429s under concurrency
+        ) as aclient:
+
+            async def embed_batch(batch_num: int, batch: List[Dict]):
+                async with semaphore:
+                    response = await aclient.embeddings.create(
+                        input=[doc["page_content"] for doc in batch],
+                        model=self.deployment
+                    )
+                logger.info(f"  Batch {batch_num}/{total_batches} complete")
+                return response
+
+            return await asyncio.gather(
+                *[embed_batch(batch_num, batch) for batch_num, batch in enumerate(batches, 1)],
+                return_exceptions=True
+            )
+
 
 class EmbeddingPipeline:
     """Complete embedding pipeline: chunk + embed"""
@@ -221,6 +344,96 @@ class EmbeddingPipeline:
         logger.info("Embedding pipeline complete")
         return embedded_docs
 
+    def process_documents_stream(
+        self,
+        documents: Iterable[Dict],
+        group_size: Optional[int] = None
+    ) -> Iterator[List[Dict]]:
+        """
+        Streaming pipeline: chunk and embed documents as they arrive
+
+        WHY: process_documents materializes every stage, so wall time is the
+             sum of load + chunk + embed and RAM holds the whole corpus.
+             Here a producer thread chunks incoming documents into a bounded
+             queue while this generator embeds the previous group, so stages
+             overlap. Memory holds a few groups (the queue, the group being
+             embedded, the one yielded) plus the embedder's LRU of at most
+             settings.embedding_cache_size vectors - not the whole corpus.
+
+        Args:
+            documents: Any iterable of {page_content, metadata} dicts
+                       (e.g. AzureBlobDocumentLoader.iter_documents())
+            group_size: Chunks per embedding group (default fills one
+                        concurrent window of 16-text batches)
+
+        Yields:
+            Lists of embedded chunks, ready for upload
+        """
+        group_size = group_size or 16 * settings.embed_concurrency
+
+        # WHY: maxsize bounds memory - the producer blocks when embedding falls behind
+        chunk_queue: queue.Queue = queue.Queue(maxsize=4)
+        stop = threading.Event()
+        done = object()
+        errors = []
+
+        def put(item) -> bool:
+            # WHY: Timed puts let a blocked producer notice that the consumer
+            #      stopped reading, instead of waiting on a full queue forever
+            while not stop.is_set():
+                try:
+                    chunk_queue.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            try:
+                group = []
+                for doc in documents:
+                    if stop.is_set():
+                        return
+
+                    group.extend(self.chunker.chunk_document(doc))
+                    if len(group) >= group_size:
+                        if not put(group):
+                            return
+                        group = []
+
+                if group:
+                    put(group)
+
+            except Exception as e:
+                errors.append(e)
+
+            finally:
+                put(done)
+
+        logger.info("Starting streaming embedding pipeline...")
+
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+
+        try:
+            while True:
+                group = chunk_queue.get()
+                if group is done:
+                    break
+
+                yield self.embedder.embed_documents(group)
+
+        finally:
+            # WHY: Runs on early close or an embedding error too - releases the producer
+            stop.set()
+
+        producer.join()
+
+        if errors:
+            raise errors[0]
+
+        logger.info("Streaming embedding pipeline complete")
+
 
 # ====================
 # USAGE EXAMPLE
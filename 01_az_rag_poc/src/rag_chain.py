@@ -7,9 +7,10 @@ from typing import Dict
 from openai import AzureOpenAI
 from src.retriever import HybridRetriever
 from src.utils.logger import get_logger
-from src.utils.config import settings
+from src.utils.config import get_settings
 
 logger = get_logger(__name__)
+settings = get_settings()
 
 
 class RAGChain:
@@ -118,9 +119,9 @@ class RAGChain:
         logger.info(f"Processing query: '{question}'")
 
         # Step 1: Retrieve relevant documents
-        documents = self.retriever.retrieve(question)
+        batch = self.retriever.retrieve_batch(question)
 
-        if not documents:
+        if not len(batch):
             return {
                 "question": question,
                 "answer": "I don't have any relevant documents to answer this question.",
@@ -129,7 +130,7 @@ class RAGChain:
             }
 
         # Step 2: Format context
-        context = self.retriever.format_context(documents)
+        context = self.retriever.format_context(batch)
 
         # Step 3: Generate answer
         result = self.generate_answer(question, context)
@@ -140,12 +141,14 @@ class RAGChain:
             "answer": result["answer"],
             "sources": [
                 {
-                    "file": doc["metadata"].get("source_file"),
-                    "page": doc["metadata"].get("page"),
-                    "score": doc.get("score"),
-                    "preview": doc["content"][:150] + "..."
+                    "file": source,
+                    "page": page,
+                    "score": score,
+                    "preview": content[:150] + "..."
                 }
-                for doc in documents
+                for source, page, score, content in zip(
+                    batch.sources, batch.pages, batch.scores.tolist(), batch.contents
+                )
             ],
             "usage": result.get("usage", {})
         }
@@ -3,15 +3,86 @@ Azure AI Search Hybrid Retriever
 Purpose: Retrieve relevant documents using hybrid search
 """
 
-from typing import List, Dict
+import asyncio
+import io
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Dict, Iterable, Iterator, Tuple, Union
+import httpx
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from azure.core.pipeline.transport import RequestsTransport
 from azure.search.documents import SearchClient
+from azure.search.documents.aio import SearchClient as AsyncSearchClient
 from azure.search.documents.models import VectorizedQuery
 from azure.core.credentials import AzureKeyCredential
-from openai import AzureOpenAI
+from openai import AzureOpenAI, AsyncAzureOpenAI
 from src.utils.logger import get_logger
-from src.utils.config import settings
+from src.utils.config import get_settings
 
 logger = get_logger(__name__)
+settings = get_settings()
+
+# WHY: Max texts per embeddings request for Azure OpenAI ada-002 deployments
+EMBED_BATCH = 16
+
+# WHY: Bounded so a long-running Streamlit process cannot grow without limit
+EMBEDDING_CACHE_SIZE = 1024
+
+# WHY: Candidates fetched per ranker before local fusion (Azure's own
+#      hybrid query fuses the top 50 of each leg)
+RRF_CANDIDATES = 50
+
+# WHY: Only the fields _format_result reads come back over the wire
+SEARCH_SELECT = ["id", "content", "source_file", "page", "chunk"]
+
+# WHY: Keep-alive connections per service; concurrent callers (Streamlit
+#      sessions sharing one retriever) reuse warm TLS connections
+HTTP_POOL_SIZE = 50
+
+
+def _run_sync(coro):
+    """
+    Run a coroutine to completion from synchronous code
+
+    WHY: asyncio.run cannot start inside a running event loop (FastAPI
+         handlers, notebooks, async Streamlit callbacks) - fail with a
+         pointer to the async method instead of asyncio's generic error
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    coro.close()
+    raise RuntimeError(
+        f"{coro.__qualname__} must be awaited when an event loop is already running"
+    )
+
+
+@dataclass(slots=True, frozen=True)
+class RetrievedBatch:
+    """
+    Retrieved documents stored column-wise
+
+    WHY: One list per field instead of a dict per document - fewer
+         allocations, and scores live in one array for vectorized ranking
+    """
+
+    contents: List[str]
+    sources: List[str]
+    pages: List[int]
+    chunks: List[int]
+    scores: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.contents)
+
+    def ranked(self) -> np.ndarray:
+        """Row indices ordered by descending score"""
+        return np.argsort(-self.scores, kind="stable")
 
 
 class HybridRetriever:
@@ -28,33 +99,100 @@ class HybridRetriever:
         """Initialize retriever components"""
 
         # Azure OpenAI client for query embeddings
+        # WHY: Explicit pool so keep-alive connections survive between queries
+        self._http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=HTTP_POOL_SIZE,
+                max_keepalive_connections=HTTP_POOL_SIZE
+            )
+        )
         self.openai_client = AzureOpenAI(
             api_key=settings.azure_openai_api_key,
             api_version=settings.azure_openai_api_version,
-            azure_endpoint=settings.azure_openai_endpoint
+            azure_endpoint=settings.azure_openai_endpoint,
+            http_client=self._http_client
         )
 
         # Azure AI Search client
+        # WHY: requests' default pool holds 10 connections; size it so
+        #      concurrent searches don't queue for a socket or re-handshake
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE))
+
         credential = AzureKeyCredential(settings.azure_search_admin_key)
+        self.credential = credential
         self.search_client = SearchClient(
             endpoint=settings.azure_search_endpoint,
             index_name=settings.azure_search_index_name,
-            credential=credential
+            credential=credential,
+            transport=RequestsTransport(session=session)
         )
 
         self.embedding_deployment = settings.azure_openai_embedding_deployment
         self.top_k = settings.top_k_results
 
+        # WHY: LRU of (deployment, query) -> embedding; Streamlit reruns and
+        #      repeated follow-ups skip the embedding round-trip entirely
+        self._embedding_cache: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self._embedding_cache_lock = threading.Lock()
+
         logger.info(f"HybridRetriever initialized")
         logger.info(f"  Top K results: {self.top_k}")
 
+    def close(self):
+        """Close the pooled HTTP connections"""
+        self.search_client.close()
+        self._http_client.close()
+
     def embed_query(self, query: str) -> List[float]:
         """Generate embedding for query"""
-        response = self.openai_client.embeddings.create(
-            input=query,
-            model=self.embedding_deployment
-        )
-        return response.data[0].embedding
+        return self.embed_queries([query])[0]
+
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for many queries
+
+        WHY: One request per EMBED_BATCH queries instead of one per query -
+             collapses N HTTPS round-trips into ceil(N / 16)
+        """
+        embeddings, misses = self._lookup_embeddings(queries)
+
+        for i in range(0, len(misses), EMBED_BATCH):
+            batch = misses[i:i + EMBED_BATCH]
+            response = self.openai_client.embeddings.create(
+                input=batch,
+                model=self.embedding_deployment
+            )
+            for query, data in zip(batch, response.data):
+                embeddings[query] = data.embedding
+                self._store_embedding(query, data.embedding)
+
+        return [embeddings[query] for query in queries]
+
+    def _lookup_embeddings(self, queries: List[str]) -> Tuple[Dict[str, List[float]], List[str]]:
+        """Split queries into cached embeddings and unique misses"""
+        found = {}
+        misses = []
+
+        with self._embedding_cache_lock:
+            for query in dict.fromkeys(queries):
+                key = (self.embedding_deployment, query)
+                embedding = self._embedding_cache.get(key)
+
+                if embedding is None:
+                    misses.append(query)
+                else:
+                    self._embedding_cache.move_to_end(key)
+                    found[query] = embedding
+
+        return found, misses
+
+    def _store_embedding(self, query: str, embedding: List[float]):
+        """Insert into the LRU, evicting the least recently used entry"""
+        with self._embedding_cache_lock:
+            self._embedding_cache[(self.embedding_deployment, query)] = embedding
+            if len(self._embedding_cache) > EMBEDDING_CACHE_SIZE:
+                self._embedding_cache.popitem(last=False)
 
     def retrieve(self, query: str, top_k: int = None) -> List[Dict]:
         """
@@ -67,6 +205,26 @@ class HybridRetriever:
         Returns:
             List of relevant documents with scores
         """
+        documents = list(self.iter_retrieve(query, top_k))
+
+        logger.info(f"Retrieved {len(documents)} documents")
+
+        return documents
+
+    def iter_retrieve(self, query: str, top_k: int = None) -> Iterator[Dict]:
+        """
+        Yield relevant documents page by page as the search service returns them
+
+        WHY: With large top_k (evaluation sweeps) callers can start on the
+             first page while continuation pages are still in flight
+
+        Args:
+            query: User query string
+            top_k: Number of results to return (default from settings)
+
+        Yields:
+            Relevant documents with scores, in rank order
+        """
         if top_k is None:
             top_k = self.top_k
 
@@ -75,43 +233,262 @@ class HybridRetriever:
         # Step 1: Generate query embedding
         query_embedding = self.embed_query(query)
 
-        # Step 2: Create vector query
-        # WHY: VectorizedQuery tells Azure Search to perform vector search
-        vector_query = VectorizedQuery(
-            vector=query_embedding,
-            k_nearest_neighbors=top_k,  # WHY: How many nearest neighbors to find
-            fields="embedding"           # WHY: Which field contains vectors
+        # Step 2-4: Perform hybrid search and format results as each page arrives
+        for result in self._iter_results(query, query_embedding, top_k):
+            yield self._format_result(result)
+
+    def retrieve_batch(self, query: str, top_k: int = None) -> RetrievedBatch:
+        """
+        Retrieve relevant documents as a column-wise RetrievedBatch
+
+        Args:
+            query: User query string
+            top_k: Number of results to return (default from settings)
+
+        Returns:
+            RetrievedBatch with one entry per document, in rank order
+        """
+        if top_k is None:
+            top_k = self.top_k
+
+        logger.info(f"Retrieving documents for query: '{query}'")
+
+        query_embedding = self.embed_query(query)
+
+        contents, sources, pages, chunks, scores = [], [], [], [], []
+        for result in self._iter_results(query, query_embedding, top_k):
+            contents.append(result["content"])
+            sources.append(result.get("source_file", ""))
+            pages.append(result.get("page", 0))
+            chunks.append(result.get("chunk", 0))
+            scores.append(result.get("@search.score", 0.0))
+
+        batch = RetrievedBatch(
+            contents=contents,
+            sources=sources,
+            pages=pages,
+            chunks=chunks,
+            scores=np.asarray(scores, dtype=np.float64)
         )
 
-        # Step 3: Perform hybrid search
-        # WHY: search_text + vector_queries = hybrid search
-        #      Azure Search automatically combines scores using Reciprocal Rank Fusion (RRF)
+        logger.info(f"Retrieved {len(batch)} documents")
+
+        return batch
+
+    def _iter_results(self, query: str, query_embedding: List[float], top_k: int) -> Iterator:
+        """Run the hybrid search and yield raw results page by page"""
         results = self.search_client.search(
-            search_text=query,           # WHY: Keyword search component
-            vector_queries=[vector_query], # WHY: Vector search component
-            top=top_k,
-            select=["id", "content", "source_file", "page", "chunk"]
+            **self._search_kwargs(query, query_embedding, top_k)
         )
 
-        # Step 4: Format results
-        documents = []
-        for result in results:
-            doc = {
-                "content": result["content"],
-                "metadata": {
-                    "source_file": result.get("source_file", ""),
-                    "page": result.get("page", 0),
-                    "chunk": result.get("chunk", 0),
-                },
-                "score": result.get("@search.score", 0.0)  # WHY: RRF combined score
-            }
-            documents.append(doc)
+        for page in results.by_page():
+            yield from page
 
-        logger.info(f"Retrieved {len(documents)} documents")
+    def retrieve_many(self, queries: List[str], top_k: int = None) -> List[List[Dict]]:
+        """Sync wrapper around aretrieve_many (not callable from a running event loop)"""
+        return _run_sync(self.aretrieve_many(queries, top_k=top_k))
 
-        return documents
+    async def aretrieve(self, query: str, top_k: int = None) -> List[Dict]:
+        """Async version of retrieve"""
+        results = await self.aretrieve_many([query], top_k=top_k)
+        return results[0]
+
+    async def aretrieve_many(self, queries: List[str], top_k: int = None) -> List[List[Dict]]:
+        """
+        Retrieve documents for many queries concurrently
+
+        WHY: All queries are embedded in batched requests, then the hybrid
+             searches run concurrently - wall time ~ one search, not N.
+             Async clients are opened per call because their connections
+             are bound to the running event loop.
+
+        Returns:
+            One list of documents per query, in query order
+        """
+        if top_k is None:
+            top_k = self.top_k
+
+        logger.info(f"Retrieving documents for {len(queries)} queries")
+
+        async with AsyncAzureOpenAI(
+            api_key=settings.azure_openai_api_key,
+            api_version=settings.azure_openai_api_version,
+            azure_endpoint=settings.azure_openai_endpoint
+        ) as openai_client, AsyncSearchClient(
+            endpoint=settings.azure_search_endpoint,
+            index_name=settings.azure_search_index_name,
+            credential=self.credential
+        ) as search_client:
+
+            # Step 1: Generate query embeddings in batches (cache misses only)
+            embeddings, misses = self._lookup_embeddings(queries)
+            batches = [misses[i:i + EMBED_BATCH] for i in range(0, len(misses), EMBED_BATCH)]
+
+            responses = await asyncio.gather(*[
+                openai_client.embeddings.create(
+                    input=batch,
+                    model=self.embedding_deployment
+                )
+                for batch in batches
+            ])
+
+            for batch, response in zip(batches, responses):
+                for query, data in zip(batch, response.data):
+                    embeddings[query] = data.embedding
+                    self._store_embedding(query, data.embedding)
+
+            query_embeddings = [embeddings[query] for query in queries]
+
+            # Step 2-4: Run hybrid searches concurrently
+            async def search(query: str, query_embedding: List[float]) -> List[Dict]:
+                results = await search_client.search(
+                    **self._search_kwargs(query, query_embedding, top_k)
+                )
+                return [self._format_result(result) async for result in results]
+
+            return await asyncio.gather(*[
+                search(query, query_embedding)
+                for query, query_embedding in zip(queries, query_embeddings)
+            ])
+
+    def retrieve_rrf(self, query: str, top_k: int = None, k_rrf: int = 60) -> List[Dict]:
+        """Sync wrapper around aretrieve_rrf (not callable from a running event loop)"""
+        return _run_sync(self.aretrieve_rrf(query, top_k=top_k, k_rrf=k_rrf))
+
+    async def aretrieve_rrf(self, query: str, top_k: int = None, k_rrf: int = 60) -> List[Dict]:
+        """
+        Retrieve documents by fusing vector-only and keyword-only rankings locally
+
+        WHY: Server-side hybrid search fixes the RRF constant; fusing here
+             lets k_rrf be tuned per corpus (smaller k favours top ranks)
+             without touching the index
+
+        Args:
+            query: User query string
+            top_k: Number of fused results to return (default from settings)
+            k_rrf: RRF smoothing constant, score = sum(1 / (k_rrf + rank))
+
+        Returns:
+            List of documents with their fused RRF score
+        """
+        if top_k is None:
+            top_k = self.top_k
+
+        logger.info(f"Retrieving documents with local RRF (k={k_rrf}) for query: '{query}'")
 
-    def format_context(self, documents: List[Dict]) -> str:
+        # WHY: The sync embeddings call blocks on HTTP - run it in a thread so
+        #      other coroutines on this loop keep running meanwhile
+        query_embedding = await asyncio.to_thread(self.embed_query, query)
+        candidates = max(RRF_CANDIDATES, top_k)
+
+        async with AsyncSearchClient(
+            endpoint=settings.azure_search_endpoint,
+            index_name=settings.azure_search_index_name,
+            credential=self.credential
+        ) as search_client:
+
+            async def ranked(**kwargs) -> List[Tuple[str, Dict]]:
+                results = await search_client.search(
+                    top=candidates,
+                    include_total_count=False,
+                    select=SEARCH_SELECT,
+                    **kwargs
+                )
+                return [(result["id"], self._format_result(result)) async for result in results]
+
+            # Step 1: Run both rankers concurrently
+            vector_ranked, keyword_ranked = await asyncio.gather(
+                ranked(
+                    search_text=None,
+                    vector_queries=[VectorizedQuery(
+                        vector=query_embedding,
+                        k_nearest_neighbors=candidates,
+                        fields="embedding",
+                        exhaustive=False,
+                        oversampling=2.0
+                    )]
+                ),
+                ranked(
+                    search_text=query,
+                    search_fields=["content"],
+                    query_type="simple"
+                )
+            )
+
+        # Step 2: Align ranks by document id (missing rank -> inf -> 0 score)
+        documents = {}
+        for doc_id, document in vector_ranked + keyword_ranked:
+            documents.setdefault(doc_id, document)
+
+        if not documents:
+            logger.info("Retrieved 0 documents")
+            return []
+
+        doc_ids = list(documents)
+        position = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+
+        ranks = np.full((2, len(doc_ids)), np.inf, dtype=np.float32)
+        for row, ranking in enumerate((vector_ranked, keyword_ranked)):
+            for rank, (doc_id, _) in enumerate(ranking, 1):
+                ranks[row, position[doc_id]] = rank
+
+        # Step 3: Fuse and take the top_k
+        scores = (1.0 / (k_rrf + ranks)).sum(axis=0)
+
+        if top_k < len(scores):
+            top = np.argpartition(-scores, top_k)[:top_k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        results = []
+        for i in top.tolist():
+            document = documents[doc_ids[i]]
+            document["score"] = float(scores[i])  # WHY: Fused RRF score
+            results.append(document)
+
+        logger.info(f"Retrieved {len(results)} documents")
+
+        return results
+
+    def _search_kwargs(self, query: str, query_embedding: List[float], top_k: int) -> Dict:
+        """Build hybrid search arguments shared by the sync and async paths"""
+
+        # WHY: VectorizedQuery tells Azure Search to perform vector search
+        vector_query = VectorizedQuery(
+            vector=query_embedding,
+            k_nearest_neighbors=top_k,  # WHY: How many nearest neighbors to find
+            fields="embedding",          # WHY: Which field contains vectors
+            exhaustive=False,            # WHY: Use the HNSW graph, not a brute-force scan
+            oversampling=2.0             # WHY: Rescore extra int8 candidates at full precision
+        )
+
+        # WHY: search_text + vector_queries = hybrid search
+        #      Azure Search automatically combines scores using Reciprocal Rank Fusion (RRF)
+        return {
+            "search_text": query,             # WHY: Keyword search component
+            "search_fields": ["content"],     # WHY: Only score keywords against chunk text
+            "query_type": "simple",           # WHY: Skip the semantic ranker pipeline
+            "vector_queries": [vector_query], # WHY: Vector search component
+            "top": top_k,
+            "include_total_count": False,     # WHY: Total match count is never used
+            "select": SEARCH_SELECT
+        }
+
+    @staticmethod
+    def _format_result(result) -> Dict:
+        """Convert a search result into a document dict"""
+        return {
+            "content": result["content"],
+            "metadata": {
+                "source_file": result.get("source_file", ""),
+                "page": result.get("page", 0),
+                "chunk": result.get("chunk", 0),
+            },
+            "score": result.get("@search.score", 0.0)  # WHY: RRF combined score
+        }
+
+    def format_context(self, documents: Union[List[Dict], RetrievedBatch]) -> str:
         """
         Format retrieved documents as context for LLM
 
@@ -120,19 +497,41 @@ class HybridRetriever:
         if not documents:
             return "No relevant documents found."
 
-        context_parts = []
+        if isinstance(documents, RetrievedBatch):
+            rows = zip(documents.sources, documents.pages, documents.scores.tolist(), documents.contents)
+        else:
+            rows = (
+                (
+                    doc["metadata"].get("source_file", "unknown"),
+                    doc["metadata"].get("page", "?"),
+                    doc.get("score", 0.0),
+                    doc["content"]
+                )
+                for doc in documents
+            )
 
-        for idx, doc in enumerate(documents, 1):
-            source = doc["metadata"].get("source_file", "unknown")
-            page = doc["metadata"].get("page", "?")
-            score = doc.get("score", 0.0)
+        return self._write_context(rows)
 
-            context_parts.append(
-                f"[Document {idx}] (Source: {source}, Page: {page}, Score: {score:.3f})\n"
-                f"{doc['content']}\n"
-            )
+    # WHY: Format string parsed once at class load, bound .format avoids
+    #      rebuilding the string piece by piece per document
+    _DOC_TEMPLATE = "[Document {idx}] (Source: {source}, Page: {page}, Score: {score:.3f})\n{content}\n".format
+
+    @classmethod
+    def _write_context(cls, rows: Iterable[Tuple]) -> str:
+        """Write (source, page, score, content) rows into one context string"""
+        template = cls._DOC_TEMPLATE
+
+        # WHY: Write straight into one buffer instead of collecting parts
+        #      and joining them afterwards
+        buf = io.StringIO()
+        write = buf.write
+
+        for idx, (source, page, score, content) in enumerate(rows, 1):
+            if idx > 1:
+                write("\n")
+            write(template(idx=idx, source=source, page=page, score=score, content=content))
 
-        return "\n".join(context_parts)
+        return buf.getvalue()
 
 
 # ====================
@@ -150,14 +549,19 @@ if __name__ == "__main__":
         "Explain embeddings and vector search"
     ]
 
-    for query in test_queries:
+    async def main_demo():
+        # WHY: Queries overlap on the network - wall time ~ the slowest one
+        return await asyncio.gather(*[
+            retriever.aretrieve(query, top_k=3) for query in test_queries
+        ])
+
+    all_documents = asyncio.run(main_demo())
+
+    for query, documents in zip(test_queries, all_documents):
         print(f"\n" + "="*80)
         print(f"Query: {query}")
         print("="*80)
 
-        # Retrieve documents
-        documents = retriever.retrieve(query, top_k=3)
-
         if not documents:
             print("No results found")
             continue
@@ -172,3 +576,5 @@ if __name__ == "__main__":
         print(f"\n--- Formatted Context ---")
         context = retriever.format_context(documents)
         print(context[:500] + "..." if len(context) > 500 else context)
+
+    retriever.close()
@@ -3,8 +3,9 @@ Streamlit Web UI for RAG System
 Purpose: Interactive interface for document Q&A
 """
 
+import threading
 import streamlit as st
-from src.rag_chain import RAG Chain
+from src.rag_chain import RAGChain
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -18,7 +19,7 @@ st.set_page_config(
 )
 
 
-@st.cache_resource
+@st.cache_resource(ttl=None, max_entries=1, show_spinner=False)
 def load_rag_chain():
     """
     Load RAG chain (cached for performance)
@@ -29,6 +30,28 @@ def load_rag_chain():
     return RAGChain()
 
 
+def _prewarm_rag_chain():
+    """Build the cached RAG chain off the script thread"""
+    try:
+        load_rag_chain()
+    except Exception as e:
+        # WHY: main() retries and shows the error to the user
+        logger.error(f"RAG chain prewarm failed: {e}")
+
+
+@st.cache_resource(show_spinner=False)
+def start_prewarm() -> threading.Thread:
+    """
+    Start RAG chain initialization in the background, once per process
+
+    WHY: Azure client setup overlaps with page rendering, so the first
+         question reuses a ready chain; cached so reruns don't respawn it
+    """
+    thread = threading.Thread(target=_prewarm_rag_chain, daemon=True)
+    thread.start()
+    return thread
+
+
 def display_sources(sources):
     """Display source documents in expandable sections"""
     st.subheader("Sources")
@@ -38,6 +61,9 @@ def display_sources(sources):
             st.text(source['preview'])
 
 
+start_prewarm()
+
+
 def main():
     """Main Streamlit application"""
 
@@ -1,36 +1,105 @@
 """Application configuration from environment variables"""
 
 import os
-from pydantic_settings import BaseSettings
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
-class Settings(BaseSettings):
-    """Application settings"""
+class Settings(NamedTuple):
+    """
+    Application settings
+
+    WHY: A plain immutable tuple read straight from os.environ - no model
+         instantiation or per-field validation on import. Set
+         SETTINGS_STRICT=1 to validate through pydantic-settings instead
+    """
 
     # Azure Storage
-    azure_storage_connection_string: str = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
-    azure_storage_container_name: str = os.getenv("AZURE_STORAGE_CONTAINER_NAME", "documents")
+    azure_storage_connection_string: Optional[str] = None
+    azure_storage_container_name: str = "documents"
 
     # Azure OpenAI
-    azure_openai_endpoint: str = os.getenv("AZURE_OPENAI_ENDPOINT")
-    azure_openai_api_key: str = os.getenv("AZURE_OPENAI_API_KEY")
-    azure_openai_api_version: str = os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-01")
-    azure_openai_embedding_deployment: str = os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT", "text-embedding-ada-002")
-    azure_openai_chat_deployment: str = os.getenv("AZURE_OPENAI_CHAT_DEPLOYMENT", "gpt-4o-mini")
+    azure_openai_endpoint: Optional[str] = None
+    azure_openai_api_key: Optional[str] = None
+    azure_openai_api_version: str = "2024-02-01"
+    azure_openai_embedding_deployment: str = "text-embedding-ada-002"
+    azure_openai_chat_deployment: str = "gpt-4o-mini"
 
     # Azure AI Search
-    azure_search_endpoint: str = os.getenv("AZURE_SEARCH_ENDPOINT")
-    azure_search_admin_key: str = os.getenv("AZURE_SEARCH_ADMIN_KEY")
-    azure_search_index_name: str = os.getenv("AZURE_SEARCH_INDEX_NAME", "documents-index")
+    azure_search_endpoint: Optional[str] = None
+    azure_search_admin_key: Optional[str] = None
+    azure_search_index_name: str = "documents-index"
 
     # Configuration
-    chunk_size: int = int(os.getenv("CHUNK_SIZE", "1000"))
-    chunk_overlap: int = int(os.getenv("CHUNK_OVERLAP", "200"))
-    top_k_results: int = int(os.getenv("TOP_K_RESULTS", "4"))
-    log_level: str = os.getenv("LOG_LEVEL", "INFO")
+    chunk_size: int = 1000
+    chunk_overlap: int = 200
+    top_k_results: int = 4
+    blob_download_workers: int = 16
+    embed_concurrency: int = 16
+    index_batch_size: int = 1000
+    # WHY: Unique chunk embeddings kept for re-use (~6 KB each for ada-002)
+    embedding_cache_size: int = 10000
+
+    # HNSW vector index tuning
+    hnsw_m: int = 16
+    hnsw_ef_construction: int = 400
+    hnsw_ef_search: int = 100
+
+    # WHY: Compressed-vector truncation; only valid for Matryoshka embedding
+    #      models such as text-embedding-3-*, so off by default for ada-002
+    embedding_truncation_dimension: Optional[int] = None
+
+    log_level: str = "INFO"
+
+
+# WHY: Fields parsed as int; everything else stays a string
+_INT_FIELDS = frozenset(
+    name for name, type_ in Settings.__annotations__.items()
+    if type_ in (int, Optional[int])
+)
+
+
+def _build_settings() -> Settings:
+    """Read every field from its upper-cased environment variable"""
+    env = os.environ
+    values = {}
+
+    for name in Settings._fields:
+        raw = env.get(name.upper())
+        if raw is None or raw == "":
+            continue
+        values[name] = int(raw) if name in _INT_FIELDS else raw
+
+    return Settings(**values)
+
+
+def _build_strict_settings() -> Settings:
+    """Validate the environment with pydantic-settings, then freeze as Settings"""
+    from pydantic import create_model
+    from pydantic_settings import BaseSettings
+
+    StrictSettings = create_model(
+        "StrictSettings",
+        __base__=BaseSettings,
+        **{
+            name: (Settings.__annotations__[name], Settings._field_defaults[name])
+            for name in Settings._fields
+        }
+    )
+
+    return Settings(**StrictSettings().model_dump())
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide Settings, parsed from the environment once"""
+    if os.getenv("SETTINGS_STRICT") == "1":
+        return _build_strict_settings()
+    return _build_settings()
 
 
-settings = Settings()
+settings = get_settings()
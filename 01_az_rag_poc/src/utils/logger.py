@@ -2,15 +2,32 @@
 
 import sys
 from loguru import logger
-from src.utils.config import settings
+from src.utils.config import get_settings
 
+settings = get_settings()
+
+_CONFIGURED = False
+
+
+def _configure_once():
+    """Install the stdout sink on first use"""
+    global _CONFIGURED
+    if _CONFIGURED:
+        return
 
-def get_logger(name: str):
-    """Get configured logger"""
     logger.remove()
+    # WHY: enqueue=True hands writes to loguru's background thread so
+    #      logging doesn't block retrieval hot paths
     logger.add(
         sys.stdout,
         format="<green>{time:HH:mm:ss}</green> | <level>{level:8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan> - <level>{message}</level>",
-        level=settings.log_level
+        level=settings.log_level,
+        enqueue=True
     )
+    _CONFIGURED = True
+
+
+def get_logger(name: str):
+    """Get configured logger"""
+    _configure_once()
     return logger.bind(name=name)
@@ -4,27 +4,45 @@ Purpose: Create sample PDFs for testing the RAG system
 """
 
 from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfgen import canvas
 from pathlib import Path
 
+MARGIN = 72        # 1 inch
+LINE_HEIGHT = 14
+BODY_FONT = ("Helvetica", 11)
+
 
 def create_test_pdf(filename: str, title: str, content: list):
-    """Create a PDF with given content"""
-    doc = SimpleDocTemplate(filename, pagesize=letter)
-    styles = getSampleStyleSheet()
-    story = []
-    
+    """
+    Create a PDF with given content
+
+    WHY: Draws straight onto a canvas - no Platypus flowables or layout
+         pass, so generating hundreds of PDFs for load tests stays fast
+    """
+    page_width, page_height = letter
+    text_width = page_width - 2 * MARGIN
+
+    c = canvas.Canvas(filename, pagesize=letter)
+
     # Add title
-    story.append(Paragraph(title, styles['Title']))
-    story.append(Spacer(1, 12))
-    
+    c.setFont("Helvetica-Bold", 16)
+    c.drawCentredString(page_width / 2, page_height - MARGIN, title)
+    y = page_height - MARGIN - 30
+
     # Add content
+    c.setFont(*BODY_FONT)
     for text in content:
-        story.append(Paragraph(text, styles['BodyText']))
-        story.append(Spacer(1, 12))
-    
-    doc.build(story)
+        for line in simpleSplit(text, *BODY_FONT, text_width):
+            if y < MARGIN:
+                c.showPage()
+                c.setFont(*BODY_FONT)
+                y = page_height - MARGIN
+            c.drawString(MARGIN, y, line)
+            y -= LINE_HEIGHT
+        y -= LINE_HEIGHT  # WHY: Blank line between paragraphs
+
+    c.save()
 
 
 def generate_all_test_documents():
@@ -5,28 +5,33 @@ Purpose: Load and extract text from PDF documents
 CV Mapping: Document processing pipelines, PDF parsing, metadata extraction
 """
 
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Dict, Iterator, List
+import numpy as np
 from langchain_community.document_loaders import PyPDFLoader
-# from langchain.schema import Document
-# try all known locations; if none are available, fall back to Any
-try:
-    from langchain.schema import Document
-except ImportError:
-    try:
-        from langchain_core.schema import Document
-    except ImportError:
-        try:
-            from langchain.docstore.document import Document
-        except ImportError:
-            Document = Any   # no langchain installed
 
 from src.utils.logger import get_logger
 from src.utils.config import settings
+from src.utils.compat import get_document_cls
+
+Document = get_document_cls()
 
 logger = get_logger(__name__)
 
 
+def _load_pdf_pages(path_str: str) -> List[Document]:
+    """
+    Parse one PDF into per-page Documents
+
+    WHY: Module-level so ProcessPoolExecutor can pickle it - pdf parsing
+         is CPU-bound pure Python and would otherwise run on one core
+    """
+    # WHY: LangChain's PyPDFLoader preserves page numbers
+    return PyPDFLoader(path_str).load()
+
+
 class DocumentLoader:
     """
     Loads documents from various file formats
@@ -60,29 +65,49 @@ class DocumentLoader:
             List of Document objects with content and metadata
         """
         documents = []
+        for file_documents in self.iter_documents():
+            documents.extend(file_documents)
+
+        logger.info(f"Total documents loaded: {len(documents)}")
+        return documents
 
+    def iter_documents(self) -> Iterator[List[Document]]:
+        """
+        Yield the pages of each supported file, in file order
+
+        WHY: Callers can chunk and embed one file while the worker
+             processes are still parsing the next ones
+
+        Yields:
+            List of Document objects for one file
+        """
         # STEP 1: Find all PDF files
         pdf_files = list(self.data_dir.glob("*.pdf"))
 
         if not pdf_files:
             logger.warning(f"No PDF files found in {self.data_dir}")
-            return documents
+            return
 
         logger.info(f"Found {len(pdf_files)} PDF files")
 
-        # STEP 2: Load each PDF
-        for pdf_path in pdf_files:
-            try:
-                docs = self._load_pdf(pdf_path)
-                documents.extend(docs)
-                logger.info(f"Loaded {pdf_path.name}: {len(docs)} pages")
+        # STEP 2: Load PDFs in parallel worker processes
+        with ProcessPoolExecutor(max_workers=settings.loader_workers) as executor:
+            futures = [
+                (pdf_path, executor.submit(_load_pdf_pages, str(pdf_path)))
+                for pdf_path in pdf_files
+            ]
 
-            except Exception as e:
-                logger.error(f"Failed to load {pdf_path.name}: {e}")
-                continue
+            # WHY: Collect in file order so output matches the serial loader
+            for pdf_path, future in futures:
+                try:
+                    docs = self._enrich_metadata(future.result(), pdf_path)
+                    logger.info(f"Loaded {pdf_path.name}: {len(docs)} pages")
 
-        logger.info(f"Total documents loaded: {len(documents)}")
-        return documents
+                except Exception as e:
+                    logger.error(f"Failed to load {pdf_path.name}: {e}")
+                    continue
+
+                yield docs
 
     def _load_pdf(self, file_path: Path) -> List[Document]:
         """
@@ -96,10 +121,10 @@ class DocumentLoader:
         Returns:
             List of Document objects (one per page)
         """
-        # WHY: LangChain's PyPDFLoader preserves page numbers
-        loader = PyPDFLoader(str(file_path))
-        documents = loader.load()
+        return self._enrich_metadata(_load_pdf_pages(str(file_path)), file_path)
 
+    def _enrich_metadata(self, documents: List[Document], file_path: Path) -> List[Document]:
+        """Add source_file metadata to loaded pages"""
         # STEP 3: Enrich metadata
         for doc in documents:
             doc.metadata['source_file'] = file_path.name
@@ -122,15 +147,16 @@ class DocumentLoader:
         if not documents:
             return {"total_docs": 0, "total_chars": 0, "avg_chars_per_doc": 0}
 
-        total_chars = sum(len(doc.page_content) for doc in documents)
+        total_chars = int(np.fromiter(
+            (len(doc.page_content) for doc in documents),
+            dtype=np.int64,
+            count=len(documents)
+        ).sum())
 
         # Group by source file
-        files = {}
-        for doc in documents:
-            source = doc.metadata.get('source_file', 'unknown')
-            if source not in files:
-                files[source] = 0
-            files[source] += 1
+        files = dict(Counter(
+            doc.metadata.get('source_file', 'unknown') for doc in documents
+        ))
 
         stats = {
             "total_docs": len(documents),
@@ -5,48 +5,26 @@ Purpose: Chunk documents and generate embeddings
 CV Mapping: Text preprocessing, embedding generation, vector representations
 """
 
-from typing import List, Any
-# from langchain.text_splitter import RecursiveCharacterTextSplitter
-# text‑splitter moved around between releases
-# from langchain.schema import Document
-# text‑splitter has wandered around a bit
-try:
-    from langchain.text_splitters import RecursiveCharacterTextSplitter
-except ImportError:
-    try:
-        from langchain_text_splitters import RecursiveCharacterTextSplitter
-    except ImportError:
-        try:
-            from langchain.text_splitter import RecursiveCharacterTextSplitter
-        except ImportError:
-            RecursiveCharacterTextSplitter = None   # type: ignore
-
-if RecursiveCharacterTextSplitter is None:
-    raise ImportError(
-        "RecursiveCharacterTextSplitter cannot be imported. "
-        "Install langchain-text-splitters (e.g. "
-        "`pip install langchain-text-splitters==1.1.1`) or pin a "
-        "compatible LangChain release in requirements.txt."
-    )
-
-# document type location varies as well
-try:
-    from langchain.schema import Document
-except ImportError:
-    try:
-        from langchain_core.schema import Document
-    except ImportError:
-        try:
-            from langchain.docstore.document import Document
-        except ImportError:
-            Document = Any
-
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List
+import numpy as np
 from langchain_openai import OpenAIEmbeddings
+from openai import OpenAI
 from src.utils.logger import get_logger
-from src.utils.config import settings
+from src.utils.config import settings, get_shared_http_client
+from src.utils.compat import get_document_cls, get_splitter_cls
+
+Document = get_document_cls()
+RecursiveCharacterTextSplitter = get_splitter_cls()
 
 logger = get_logger(__name__)
 
+# WHY: Texts per embeddings request and requests in flight for embed_chunks
+EMBED_BATCH_SIZE = 16
+EMBED_MAX_WORKERS = 8
+# WHY: Chunks per batch yielded by iter_chunk_batches
+CHUNK_BATCH_SIZE = 64
+
 
 class EmbeddingPipeline:
     """
@@ -76,7 +54,16 @@ class EmbeddingPipeline:
         #      Cost: $0.02/1M tokens (10x cheaper than text-embedding-ada-002)
         self.embeddings = OpenAIEmbeddings(
             model=settings.embedding_model,
-            openai_api_key=settings.openai_api_key
+            openai_api_key=settings.openai_api_key,
+            http_client=get_shared_http_client()
+        )
+
+        # STEP 3: Raw OpenAI client for batched chunk embedding
+        # WHY: Sends many chunk texts per request; max_retries backs off on 429s
+        self.client = OpenAI(
+            api_key=settings.openai_api_key,
+            max_retries=5,
+            http_client=get_shared_http_client()
         )
 
         logger.info(f"EmbeddingPipeline initialized")
@@ -98,32 +85,107 @@ class EmbeddingPipeline:
         """
         logger.info(f"Chunking {len(documents)} documents...")
 
-        # STEP 1: Split documents
-        chunks = self.text_splitter.split_documents(documents)
-
-        # STEP 2: Enrich chunk metadata
-        for i, chunk in enumerate(chunks):
-            chunk.metadata['chunk_id'] = i
-            # WHY: Chunk ID enables tracking which chunks were retrieved
+        chunks = [chunk for batch in self.iter_chunk_batches(documents) for chunk in batch]
 
         logger.info(f"Created {len(chunks)} chunks")
         logger.info(f"  Average chunk size: {sum(len(c.page_content) for c in chunks) // len(chunks)} chars")
 
         return chunks
 
+    def iter_chunk_batches(
+        self,
+        documents: List[Document],
+        batch_size: int = CHUNK_BATCH_SIZE,
+        start_id: int = 0
+    ) -> Iterator[List[Document]]:
+        """
+        Split documents into chunks, yielded in batches
+
+        WHY: A batch can be sent to embed_texts while the rest are still
+             being split (or their source files still being loaded)
+
+        Args:
+            documents: List of Document objects
+            batch_size: Chunks per yielded batch
+            start_id: First chunk_id, for numbering across several calls
+
+        Yields:
+            Lists of at most batch_size chunked Document objects
+        """
+        batch = []
+        chunk_id = start_id
+
+        for document in documents:
+            # STEP 1: Split document
+            for chunk in self.text_splitter.split_documents([document]):
+                # STEP 2: Enrich chunk metadata
+                chunk.metadata['chunk_id'] = chunk_id
+                # WHY: Chunk ID enables tracking which chunks were retrieved
+                chunk_id += 1
+
+                batch.append(chunk)
+                if len(batch) == batch_size:
+                    yield batch
+                    batch = []
+
+        if batch:
+            yield batch
+
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts in a single embeddings request"""
+        response = self.client.embeddings.create(
+            input=texts,
+            model=settings.embedding_model
+        )
+        return [data.embedding for data in response.data]
+
+    def embed_chunks(self, chunks: List[Document]) -> List[List[float]]:
+        """
+        Generate embeddings for chunks in batched, concurrent requests
+
+        WHY: Calls embeddings.create with a list of texts per request and
+             runs several requests at once, instead of one chunk per request
+
+        Args:
+            chunks: List of chunked Document objects
+
+        Returns:
+            List of embedding vectors, aligned with chunks
+        """
+        texts = [chunk.page_content for chunk in chunks]
+        batches = [texts[i:i + EMBED_BATCH_SIZE] for i in range(0, len(texts), EMBED_BATCH_SIZE)]
+
+        logger.info(f"Embedding {len(texts)} chunks in {len(batches)} batches...")
+
+        # WHY: executor.map preserves batch order
+        embeddings = []
+        with ThreadPoolExecutor(max_workers=EMBED_MAX_WORKERS) as executor:
+            for batch_embeddings in executor.map(self.embed_texts, batches):
+                embeddings.extend(batch_embeddings)
+
+        logger.info(f"Generated {len(embeddings)} embeddings")
+
+        return embeddings
+
     def get_chunk_stats(self, chunks: List[Document]) -> dict:
         """Get statistics about chunks"""
         if not chunks:
             return {}
 
-        chunk_sizes = [len(chunk.page_content) for chunk in chunks]
+        # WHY: One C-level pass per reduction instead of Python generators
+        chunk_sizes = np.fromiter(
+            (len(chunk.page_content) for chunk in chunks),
+            dtype=np.int64,
+            count=len(chunks)
+        )
+        total_chars = int(chunk_sizes.sum())
 
         return {
             "total_chunks": len(chunks),
-            "min_size": min(chunk_sizes),
-            "max_size": max(chunk_sizes),
-            "avg_size": sum(chunk_sizes) // len(chunks),
-            "total_chars": sum(chunk_sizes)
+            "min_size": int(chunk_sizes.min()),
+            "max_size": int(chunk_sizes.max()),
+            "avg_size": total_chars // len(chunks),
+            "total_chars": total_chars
         }
 
     def test_embedding_generation(self, sample_text: str = "This is a test.") -> bool:
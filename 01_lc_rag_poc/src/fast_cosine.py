@@ -0,0 +1,99 @@
+"""
+Fast Cosine
+Purpose: Exact cosine scoring to rerank approximate (ANN) search candidates
+
+CV Mapping: Numerical kernels, JIT compilation, two-stage retrieval
+"""
+
+from typing import Optional, Tuple
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # WHY: Optional - NumPy's matrix-vector product is the fallback
+    numba = None
+
+
+def _cosine_scores_numpy(q: np.ndarray, X: np.ndarray) -> np.ndarray:
+    """Dot product of q with every row of X (cosine for unit vectors)"""
+    return X @ q
+
+
+if numba is not None:
+    # WHY: Eager signature compiles once at import; rows are scored in
+    #      parallel without the temporaries a BLAS call wrapper allocates
+    @numba.njit("f4[::1](f4[::1], f4[:, ::1])", fastmath=True, parallel=True, cache=True)
+    def cosine_scores(q, X):
+        n, d = X.shape
+        out = np.empty(n, dtype=np.float32)
+        for i in numba.prange(n):
+            s = np.float32(0.0)
+            for j in range(d):
+                s += q[j] * X[i, j]
+            out[i] = s
+        return out
+else:
+    cosine_scores = _cosine_scores_numpy
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Symmetric per-row int8 quantization
+
+    WHY: A quarter of float32's bytes; one scale per row keeps the full
+         [-127, 127] range for every vector
+
+    Returns:
+        (codes, scales) with vectors ~= codes / scales[:, None]
+    """
+    peak = np.abs(vectors).max(axis=1, keepdims=True)
+    scales = 127.0 / np.where(peak > 0, peak, 1.0)
+    codes = np.rint(vectors * scales).astype(np.int8)
+    return codes, scales.ravel().astype(np.float32)
+
+
+def rerank(
+    queries: np.ndarray,
+    candidates: np.ndarray,
+    vectors: np.ndarray,
+    k: int,
+    scales: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Re-score ANN candidates against stored vectors and keep the top k
+
+    WHY: Graph/IVF indexes over coarse codes rank on approximate scores;
+         finer scores for a few oversampled candidates recover most of
+         the lost recall
+
+    Args:
+        queries: (n_queries, dim) unit-normalized float32 query vectors
+        candidates: (n_queries, n_candidates) index ids, -1 for padding
+        vectors: (n_vectors, dim) unit-normalized vectors by index id, float32
+                 or int8 codes from quantize_int8
+        k: Results to keep per query
+        scales: Per-row scales when vectors are int8 codes
+
+    Returns:
+        (scores, indices) shaped (n_queries, k), padded with -inf / -1 like FAISS
+    """
+    scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+    indices = np.full((len(queries), k), -1, dtype=np.int64)
+
+    for row, (query, ids) in enumerate(zip(queries, candidates)):
+        ids = ids[ids != -1]
+        if not ids.size:
+            continue
+
+        # WHY: Gathers only the candidate rows - works on a memory-mapped array
+        rows = np.ascontiguousarray(vectors[ids], dtype=np.float32)
+        if scales is not None:
+            rows /= scales[ids, None]
+
+        exact = cosine_scores(np.ascontiguousarray(query, dtype=np.float32), rows)
+        top = np.argsort(-exact, kind="stable")[:k]
+
+        scores[row, :len(top)] = exact[top]
+        indices[row, :len(top)] = ids[top]
+
+    return scores, indices
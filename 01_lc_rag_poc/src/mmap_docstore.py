@@ -0,0 +1,206 @@
+"""
+Memory-Mapped Docstore
+Purpose: Serve chunk text and metadata from a memory-mapped file
+
+CV Mapping: Memory-mapped IO, lazy loading, binary file formats
+"""
+
+import json
+import mmap
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterator, List, MutableMapping, Optional
+
+import numpy as np
+from langchain_community.docstore.base import AddableMixin, Docstore
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from src.utils.compat import get_document_cls
+
+Document = get_document_cls()
+
+# WHY: Layout of docs.bin -
+#      [n: uint64][content offsets: (n+1) x uint64][metadata offsets: (n+1) x uint64]
+#      [UTF-8 page_content of every chunk][UTF-8 JSON metadata of every chunk]
+#      Offsets are absolute, so chunk i is bytes offsets[i]:offsets[i + 1]
+DOCS_FILE = "docs.bin"
+
+# WHY: Decoded Documents kept around; repeat hits return the same object
+MATERIALIZED_CACHE_SIZE = 4096
+
+
+def write_docstore(path: Path, documents: Iterator[Document], n_documents: int):
+    """
+    Write documents, in index order, to a docs.bin file
+
+    Args:
+        path: Output file
+        documents: Documents ordered by their FAISS index position
+        n_documents: Number of documents
+    """
+    contents = []
+    metadatas = []
+    for doc in documents:
+        contents.append(doc.page_content.encode("utf-8"))
+        # WHY: default=str keeps odd loader values (e.g. Path) serializable
+        metadatas.append(json.dumps(doc.metadata, default=str).encode("utf-8"))
+
+    header_size = 8 + 2 * (n_documents + 1) * 8
+    content_offsets = header_size + np.concatenate(
+        ([0], np.cumsum([len(c) for c in contents], dtype=np.uint64))
+    ).astype(np.uint64)
+    meta_offsets = int(content_offsets[-1]) + np.concatenate(
+        ([0], np.cumsum([len(m) for m in metadatas], dtype=np.uint64))
+    ).astype(np.uint64)
+
+    with open(path, "wb") as f:
+        f.write(np.uint64(n_documents).tobytes())
+        f.write(content_offsets.tobytes())
+        f.write(meta_offsets.tobytes())
+        f.writelines(contents)
+        f.writelines(metadatas)
+
+
+class IndexIds(MutableMapping):
+    """
+    FAISS position -> docstore id, where the id is the position itself
+
+    WHY: Stands in for LangChain's index_to_docstore_id dict without
+         holding one Python object per chunk. The first write (add_texts
+         and merge_from update it) switches to a plain dict
+    """
+
+    def __init__(self, n: int):
+        self._n = n
+        self._dict: Optional[Dict] = None
+
+    def __getitem__(self, i: int):
+        if self._dict is not None:
+            return self._dict[i]
+        if not 0 <= i < self._n:
+            raise KeyError(i)
+        return i
+
+    def __setitem__(self, i: int, doc_id):
+        self._writable()[i] = doc_id
+
+    def __delitem__(self, i: int):
+        del self._writable()[i]
+
+    def __iter__(self):
+        return iter(self._dict if self._dict is not None else range(self._n))
+
+    def __len__(self) -> int:
+        return len(self._dict) if self._dict is not None else self._n
+
+    def _writable(self) -> Dict:
+        """Switch to a dict on the first mutation"""
+        if self._dict is None:
+            self._dict = dict(zip(range(self._n), range(self._n)))
+        return self._dict
+
+    def __reduce__(self):
+        # WHY: save_local pickles the mapping - store a plain dict
+        return dict, (list(self.items()),)
+
+
+class MmapDocstore(Docstore, AddableMixin):
+    """
+    Docstore over a memory-mapped docs.bin
+
+    WHY: Unpickling the LangChain docstore decodes every chunk into RAM at
+         startup. Here pages are read on demand and only the documents a
+         search returns are ever decoded. The file is written once, so the
+         first add/delete copies every document into an InMemoryDocstore
+         and serves from that afterwards
+    """
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        n = int(np.frombuffer(self._mm, dtype=np.uint64, count=1)[0])
+        # WHY: Views into the map - the offset tables are not copied either
+        self._content_offsets = np.frombuffer(self._mm, dtype=np.uint64, count=n + 1, offset=8)
+        self._meta_offsets = np.frombuffer(self._mm, dtype=np.uint64, count=n + 1, offset=8 + (n + 1) * 8)
+        self._n = n
+
+        self._cache: "OrderedDict[int, Document]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # WHY: Set on the first mutation; takes over every lookup from then on
+        self._memory: Optional[InMemoryDocstore] = None
+
+    def __len__(self) -> int:
+        return len(self._memory._dict) if self._memory is not None else self._n
+
+    def index_ids(self) -> IndexIds:
+        """index_to_docstore_id mapping for the LangChain FAISS wrapper"""
+        return IndexIds(self._n)
+
+    def search(self, search: int) -> Document:
+        """Document at FAISS position `search` (LangChain docstore interface)"""
+        if self._memory is not None:
+            return self._memory.search(search)
+
+        with self._lock:
+            doc = self._cache.get(search)
+            if doc is not None:
+                self._cache.move_to_end(search)
+                return doc
+
+        doc = self._materialize(search)
+
+        with self._lock:
+            self._cache[search] = doc
+            if len(self._cache) > MATERIALIZED_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+        return doc
+
+    def _materialize(self, i: int) -> Document:
+        """Decode document i from the map"""
+        if not 0 <= i < self._n:
+            raise KeyError(i)
+
+        content_start, content_end = int(self._content_offsets[i]), int(self._content_offsets[i + 1])
+        meta_start, meta_end = int(self._meta_offsets[i]), int(self._meta_offsets[i + 1])
+
+        return Document(
+            page_content=self._mm[content_start:content_end].decode("utf-8"),
+            metadata=json.loads(self._mm[meta_start:meta_end])
+        )
+
+    def add(self, texts: Dict[str, Document]):
+        """Add documents (LangChain AddableMixin interface)"""
+        self._writable().add(texts)
+
+    def delete(self, ids: List):
+        """Delete documents by id (LangChain AddableMixin interface)"""
+        self._writable().delete(ids)
+
+    def _writable(self) -> InMemoryDocstore:
+        """Switch to an in-memory copy of every document on the first mutation"""
+        if self._memory is None:
+            self._memory = InMemoryDocstore(self._materialize_all())
+            with self._lock:
+                self._cache.clear()
+        return self._memory
+
+    def _materialize_all(self) -> Dict[int, Document]:
+        """Decode every document, keyed by FAISS position"""
+        return {i: self._materialize(i) for i in range(self._n)}
+
+    def __reduce__(self):
+        # WHY: save_local pickles the docstore and an mmap can't be pickled -
+        #      store the equivalent InMemoryDocstore
+        documents = self._memory._dict if self._memory is not None else self._materialize_all()
+        return InMemoryDocstore, (dict(documents),)
+
+    def close(self):
+        """Release the memory map"""
+        # WHY: Drop the numpy views first - mmap refuses to close while exported
+        self._content_offsets = self._meta_offsets = None
+        with self._lock:
+            self._cache.clear()
+        self._mm.close()
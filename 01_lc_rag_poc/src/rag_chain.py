@@ -5,7 +5,13 @@ Purpose: Combine retrieval with generation for question answering
 CV Mapping: RAG architecture, prompt engineering, LLM integration
 """
 
-from typing import Dict, List, Optional, Any
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Any, Tuple
+import numpy as np
+import tiktoken
 from langchain_openai import ChatOpenAI
 
 # Import ChatPromptTemplate (works with langchain 1.2.10 + Python 3.11)
@@ -14,18 +20,53 @@ try:
 except ImportError:
     from langchain_core.prompts import ChatPromptTemplate
 
-# Import Document type
-try:
-    from langchain.schema import Document
-except ImportError:
-    from langchain_core.documents import Document
-
 from src.retriever import Retriever
 from src.utils.logger import get_logger
-from src.utils.config import settings
+from src.utils.config import settings, get_shared_http_client
+from src.utils.compat import get_document_cls
+
+Document = get_document_cls()
 
 logger = get_logger(__name__)
 
+# WHY: Static instructions lead the prompt so OpenAI's automatic prefix
+#      cache can reuse them; per-query context and question come last
+SYSTEM_INSTRUCTIONS = """You are a helpful AI assistant that answers questions based on provided context.
+
+IMPORTANT RULES:
+1. Only use information from the provided context
+2. If the answer is not in the context, say "I don't have enough information to answer that question."
+3. Always cite your sources using the format: [Source X]
+4. Be concise but complete
+5. If multiple sources provide similar information, mention all relevant sources"""
+
+# WHY: Routes requests sharing the prefix to the same cache shard; bump
+#      the version whenever SYSTEM_INSTRUCTIONS changes
+PROMPT_CACHE_KEY = "rag_v1"
+
+# WHY: Structured prompt improves answer quality and citation
+_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", SYSTEM_INSTRUCTIONS),
+    ("human", "Context:\n{context}\n\nQuestion: {question}")
+])
+
+# WHY: OpenAI only caches prompt prefixes of at least this many tokens
+PROMPT_CACHE_MIN_TOKENS = 1024
+
+# WHY: Chat completions in flight at once for batch_query
+LLM_MAX_CONCURRENCY = 8
+
+# WHY: Formatted contexts kept for reuse when different questions retrieve
+#      the same documents
+CONTEXT_CACHE_SIZE = 256
+
+# WHY: GPT-4o-mini pricing (as of Jan 2026), USD per token for
+#      [fresh input, cached input, output]
+# Input: $0.15 per 1M tokens
+# Cached input: $0.075 per 1M tokens
+# Output: $0.60 per 1M tokens
+TOKEN_PRICES = np.array([0.15e-6, 0.075e-6, 0.60e-6], dtype=np.float64)
+
 
 class RAGChain:
     """
@@ -44,36 +85,80 @@ class RAGChain:
         # STEP 1: Initialize retriever
         self.retriever = retriever or Retriever()
 
+        # WHY: Settings read once here instead of on every query
+        self.llm_model = settings.llm_model
+        self.llm_temperature = settings.llm_temperature
+        self.max_tokens = settings.max_tokens
+        self._default_k = settings.top_k_results
+        self._semcache_enabled = settings.semantic_cache_enabled
+        self._semcache_size = settings.semantic_cache_size
+        self._semcache_threshold = settings.semantic_cache_threshold
+        self._semcache_ttl = settings.semantic_cache_ttl_seconds
+
         # STEP 2: Initialize LLM
         # WHY: gpt-4o-mini is cost-effective ($0.15/1M tokens) and fast
         self.llm = ChatOpenAI(
-            model=settings.llm_model,
-            temperature=settings.llm_temperature,  # WHY: 0 for factual answers
-            max_tokens=settings.max_tokens,
-            openai_api_key=settings.openai_api_key
+            model=self.llm_model,
+            temperature=self.llm_temperature,  # WHY: 0 for factual answers
+            max_tokens=self.max_tokens,
+            openai_api_key=settings.openai_api_key,
+            http_client=get_shared_http_client(),
+            extra_body={"prompt_cache_key": PROMPT_CACHE_KEY},
+            stream_usage=True  # WHY: Token usage on the final streamed chunk
         )
 
-        # STEP 3: Create prompt template
-        # WHY: Structured prompt improves answer quality and citation
-        self.prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are a helpful AI assistant that answers questions based on provided context.
-
-IMPORTANT RULES:
-1. Only use information from the provided context
-2. If the answer is not in the context, say "I don't have enough information to answer that question."
-3. Always cite your sources using the format: [Source X]
-4. Be concise but complete
-5. If multiple sources provide similar information, mention all relevant sources
-
-Context:
-{context}"""),
-            ("human", "{question}")
-        ])
+        # STEP 3: Prompt template
+        # WHY: Shared module-level template - stateless, so parsed once per process
+        self.prompt = _PROMPT
+
+        # WHY: Size of the static prefix every request repeats, for cost
+        #      reporting; counted once here, not per query
+        self.static_prompt_tokens = self._count_static_prompt_tokens()
+        if self.static_prompt_tokens is not None and self.static_prompt_tokens < PROMPT_CACHE_MIN_TOKENS:
+            # WHY: Caching then depends on the retrieved context making the
+            #      prompt long enough, not on the instructions alone
+            logger.info(
+                "System prompt is {} tokens, below the {}-token prompt cache minimum",
+                self.static_prompt_tokens,
+                PROMPT_CACHE_MIN_TOKENS
+            )
+
+        # STEP 4: Semantic response cache
+        # WHY: Ring buffer of L2-normalized question embeddings; one matmul
+        #      scores a new question against every cached one
+        self._semcache_keys: Optional[np.ndarray] = None  # allocated on first insert
+        self._semcache_times = np.zeros(self._semcache_size, dtype=np.float64)
+        self._semcache_k = np.zeros(self._semcache_size, dtype=np.int64)
+        self._semcache_vals: List[Optional[Dict]] = [None] * self._semcache_size
+        self._semcache_count = 0
+        self._semcache_lookups = 0
+        self._semcache_hits = 0
+        self._semcache_lock = threading.Lock()
+
+        # STEP 5: Formatted context cache
+        # WHY: LRU keyed on the retrieved documents; paraphrased questions
+        #      that miss the semantic cache often hit the same chunks
+        self._context_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._context_cache_lock = threading.Lock()
 
         logger.info("RAG Chain initialized")
-        logger.info(f"  LLM: {settings.llm_model}")
-        logger.info(f"  Temperature: {settings.llm_temperature}")
-        logger.info(f"  Max tokens: {settings.max_tokens}")
+        logger.info("  LLM: {}", self.llm_model)
+        logger.info("  Temperature: {}", self.llm_temperature)
+        logger.info("  Max tokens: {}", self.max_tokens)
+
+    def _count_static_prompt_tokens(self) -> Optional[int]:
+        """Token count of SYSTEM_INSTRUCTIONS for the configured model"""
+        try:
+            try:
+                encoding = tiktoken.encoding_for_model(self.llm_model)
+            except KeyError:
+                # WHY: Models newer than the installed tiktoken use o200k_base
+                encoding = tiktoken.get_encoding("o200k_base")
+            return len(encoding.encode(SYSTEM_INSTRUCTIONS))
+        except Exception as e:
+            # WHY: Encodings are downloaded on first use - never fail startup over it
+            logger.warning(f"Could not count system prompt tokens: {e}")
+            return None
 
     def query(
         self,
@@ -92,56 +177,362 @@ Context:
         Returns:
             Dictionary with 'answer', 'sources', and metadata
         """
-        logger.info(f"Processing query: '{question[:50]}...'")
+        logger.info("Processing query: '{}...'", question[:50])
+
+        k = k or self._default_k
+
+        # STEP 0: Reuse the answer to a near-identical earlier question
+        question_vec, cached = self._check_semantic_cache(question, k)
+        if cached is not None:
+            return self._cached_result(cached, return_sources)
 
         # STEP 1: Retrieve relevant documents
         documents = self.retriever.retrieve(question, k=k)
 
         if not documents:
             logger.warning("No documents retrieved")
-            return {
-                "answer": "I don't have any relevant information to answer that question.",
-                "sources": [],
-                "num_sources": 0
-            }
+            return self._no_documents_result()
 
-        # STEP 2: Format context
-        context = self.retriever.format_retrieved_context(documents)
+        # STEP 2-3: Format context and generate answer
+        logger.info("Generating answer with LLM...")
+
+        response = self.llm.invoke(self._build_messages(question, documents))
+        answer = response.content
+
+        logger.info("Answer generated ({} chars)", len(answer))
+
+        # STEP 4: Prepare response
+        return self._finish_result(
+            answer,
+            documents,
+            response.response_metadata.get('token_usage', {}),
+            question_vec,
+            k,
+            return_sources
+        )
+
+    async def aquery(self, question: str, k: Optional[int] = None) -> Dict:
+        """
+        Async version of query (always returns sources)
+
+        WHY: Blocking steps run in worker threads and the LLM call uses
+             ainvoke, so abatch_query overlaps many questions' round-trips
+        """
+        logger.info("Processing query: '{}...'", question[:50])
+
+        k = k or self._default_k
+
+        question_vec, cached = await asyncio.to_thread(self._check_semantic_cache, question, k)
+        if cached is not None:
+            return self._cached_result(cached, return_sources=True)
+
+        documents = await self.retriever.aretrieve(question, k=k)
+
+        if not documents:
+            logger.warning("No documents retrieved")
+            return self._no_documents_result()
 
-        # STEP 3: Generate answer
         logger.info("Generating answer with LLM...")
 
+        response = await self.llm.ainvoke(self._build_messages(question, documents))
+        answer = response.content
+
+        logger.info("Answer generated ({} chars)", len(answer))
+
+        return self._finish_result(
+            answer,
+            documents,
+            response.response_metadata.get('token_usage', {}),
+            question_vec,
+            k,
+            True
+        )
+
+    async def abatch_query(self, questions: List[str], k: Optional[int] = None) -> List[Dict]:
+        """
+        Answer many questions concurrently
+
+        WHY: Wall time ~ the slowest question instead of the sum
+
+        Returns:
+            One result dict per question, in question order
+        """
+        return await asyncio.gather(*(self.aquery(question, k=k) for question in questions))
+
+    def batch_query(self, questions: List[str], k: Optional[int] = None) -> List[Dict]:
+        """
+        Answer many questions with batched embedding, search and generation
+
+        WHY: One embeddings request, one FAISS search over all query
+             vectors, and LLM calls run concurrently via llm.batch
+
+        Returns:
+            One result dict per question (with sources), in question order
+        """
+        k = k or self._default_k
+        results: List[Optional[Dict]] = [None] * len(questions)
+
+        logger.info("Processing {} queries in batch", len(questions))
+
+        # STEP 0: Embed every question in one request, then check the semantic cache
+        self.retriever.embed_queries(questions)
+
+        question_vecs = []
+        pending = []
+        for i, question in enumerate(questions):
+            question_vec, cached = self._check_semantic_cache(question, k)
+            question_vecs.append(question_vec)
+
+            if cached is not None:
+                results[i] = self._cached_result(cached, return_sources=True)
+            else:
+                pending.append(i)
+
+        # STEP 1: Retrieve for all remaining questions at once
+        retrieved = self.retriever.retrieve_batch([questions[i] for i in pending], k=k)
+
+        to_generate = []
+        for i, documents in zip(pending, retrieved):
+            if documents:
+                to_generate.append((i, documents))
+            else:
+                results[i] = self._no_documents_result()
+
+        # STEP 2-3: Generate all answers concurrently
+        if to_generate:
+            logger.info("Generating {} answers with LLM...", len(to_generate))
+
+            responses = self.llm.batch(
+                [self._build_messages(questions[i], documents) for i, documents in to_generate],
+                config={"max_concurrency": LLM_MAX_CONCURRENCY}
+            )
+
+            # STEP 4: Prepare responses
+            for (i, documents), response in zip(to_generate, responses):
+                results[i] = self._finish_result(
+                    response.content,
+                    documents,
+                    response.response_metadata.get('token_usage', {}),
+                    question_vecs[i],
+                    k,
+                    True
+                )
+
+        return results
+
+    def query_stream(
+        self,
+        question: str,
+        k: Optional[int] = None,
+        result: Optional[Dict] = None
+    ) -> Iterator[str]:
+        """
+        Answer question using RAG, yielding the answer as it is generated
+
+        WHY: The UI can render the first tokens after ~TTFT instead of
+             waiting for the whole completion
+
+        Args:
+            question: User question
+            k: Number of documents to retrieve
+            result: Optional dict filled with the same keys as query()
+                    once the answer is complete
+
+        Yields:
+            Answer text pieces
+        """
+        logger.info("Streaming query: '{}...'", question[:50])
+
+        k = k or self._default_k
+        result = result if result is not None else {}
+
+        question_vec, cached = self._check_semantic_cache(question, k)
+        if cached is not None:
+            result.update(self._cached_result(cached, return_sources=True))
+            yield result["answer"]
+            return
+
+        documents = self.retriever.retrieve(question, k=k)
+
+        if not documents:
+            logger.warning("No documents retrieved")
+            result.update(self._no_documents_result())
+            yield result["answer"]
+            return
+
+        logger.info("Streaming answer from LLM...")
+
+        parts = []
+        final_chunk = None
+        for chunk in self.llm.stream(self._build_messages(question, documents)):
+            # WHY: Chunk addition merges usage_metadata from the final chunk
+            final_chunk = chunk if final_chunk is None else final_chunk + chunk
+            if chunk.content:
+                parts.append(chunk.content)
+                yield chunk.content
+
+        answer = "".join(parts)
+        logger.info("Answer generated ({} chars)", len(answer))
+
+        usage = getattr(final_chunk, "usage_metadata", None) or {}
+        token_usage = {
+            "prompt_tokens": usage.get("input_tokens", 0),
+            "completion_tokens": usage.get("output_tokens", 0),
+            "total_tokens": usage.get("total_tokens", 0),
+            "prompt_tokens_details": {
+                "cached_tokens": (usage.get("input_token_details") or {}).get("cache_read", 0)
+            }
+        }
+
+        result.update(self._finish_result(answer, documents, token_usage, question_vec, k, True))
+
+    def _check_semantic_cache(self, question: str, k: int):
+        """Return (normalized question vector, cached result or None)"""
+        if not self._semcache_enabled:
+            return None, None
+
+        question_vec = self._embed_normalized(question)
+        return question_vec, self._semcache_lookup(question_vec, k)
+
+    @staticmethod
+    def _cached_result(cached: Dict, return_sources: bool) -> Dict:
+        """Copy a cached result; no tokens were spent on it"""
+        result = dict(cached, tokens_used={}, cache_hit=True)
+        if not return_sources:
+            result.pop("sources", None)
+        return result
+
+    @staticmethod
+    def _no_documents_result() -> Dict:
+        return {
+            "answer": "I don't have any relevant information to answer that question.",
+            "sources": [],
+            "num_sources": 0
+        }
+
+    def _build_messages(self, question: str, documents: List[Document]) -> List:
+        """Format retrieved documents into prompt messages"""
+        context = self._format_context(documents)
+
         # WHY: Invoke chain with formatted prompt
-        messages = self.prompt.format_messages(
+        return self.prompt.format_messages(
             context=context,
             question=question
         )
 
-        response = self.llm.invoke(messages)
-        answer = response.content
+    def _format_context(self, documents: List[Document]) -> str:
+        """Format context, reusing the cached string for the same documents"""
+        # WHY: The docstore hands back the same Document objects for the same
+        #      chunks, so object ids identify a retrieval result
+        doc_key = tuple(id(doc) for doc in documents)
 
-        logger.info(f"Answer generated ({len(answer)} chars)")
+        with self._context_cache_lock:
+            cached = self._context_cache.get(doc_key)
+            if cached is not None:
+                self._context_cache.move_to_end(doc_key)
+                return cached[1]
 
-        # STEP 4: Prepare response
+        context = self.retriever.format_retrieved_context(documents)
+
+        with self._context_cache_lock:
+            # WHY: Holding the documents keeps their ids from being reused
+            self._context_cache[doc_key] = (tuple(documents), context)
+            if len(self._context_cache) > CONTEXT_CACHE_SIZE:
+                self._context_cache.popitem(last=False)
+
+        return context
+
+    def _finish_result(
+        self,
+        answer: str,
+        documents: List[Document],
+        token_usage: Dict,
+        question_vec: Optional[np.ndarray],
+        k: int,
+        return_sources: bool
+    ) -> Dict:
+        """Assemble the response dict and populate the semantic cache"""
         result = {
             "answer": answer,
             "num_sources": len(documents),
-            "tokens_used": response.response_metadata.get('token_usage', {})
+            "tokens_used": token_usage
         }
 
-        if return_sources:
+        # WHY: Always built when caching so a later hit can return sources
+        if return_sources or question_vec is not None:
             # WHY: Include source metadata for citations
+            # WHY: _preview is precomputed at index build; indexes built
+            #      before it existed fall back to slicing
             result["sources"] = [
                 {
                     "file": doc.metadata.get('source_file', 'unknown'),
                     "page": doc.metadata.get('page', 'N/A'),
-                    "content": doc.page_content[:200] + "..."
+                    "content": doc.metadata.get('_preview') or doc.page_content[:200] + "..."
                 }
                 for doc in documents
             ]
 
+        if question_vec is not None:
+            self._semcache_store(question_vec, k, dict(result))
+            logger.info(
+                "Tokens used: {}, semantic cache hit rate: {}/{}",
+                result['tokens_used'].get('total_tokens', 0),
+                self._semcache_hits,
+                self._semcache_lookups
+            )
+
+        if not return_sources:
+            result.pop("sources", None)
+
         return result
 
+    def _embed_normalized(self, question: str) -> np.ndarray:
+        """Embed the question and L2-normalize it so dot product = cosine"""
+        # WHY: Retriever's cached embedding - retrieval reuses it on a miss
+        vec = np.asarray(self.retriever.embed_query(question), dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def _semcache_lookup(self, question_vec: np.ndarray, k: int) -> Optional[Dict]:
+        """Return the cached result for the most similar fresh question, if close enough"""
+        with self._semcache_lock:
+            self._semcache_lookups += 1
+
+            n = min(self._semcache_count, self._semcache_size)
+            if n == 0:
+                return None
+
+            # WHY: One BLAS matmul over all cached keys
+            scores = self._semcache_keys[:n] @ question_vec
+
+            # WHY: Expired entries and answers built from a different k never match
+            fresh = (time.time() - self._semcache_times[:n]) < self._semcache_ttl
+            scores = np.where(fresh & (self._semcache_k[:n] == k), scores, -1.0)
+
+            best = int(scores.argmax())
+            if scores[best] < self._semcache_threshold:
+                return None
+
+            self._semcache_hits += 1
+            logger.info("Semantic cache hit (similarity {:.3f})", scores[best])
+            return self._semcache_vals[best]
+
+    def _semcache_store(self, question_vec: np.ndarray, k: int, result: Dict):
+        """Insert into the ring buffer, overwriting the oldest entry when full"""
+        with self._semcache_lock:
+            if self._semcache_keys is None:
+                self._semcache_keys = np.zeros(
+                    (self._semcache_size, question_vec.shape[0]),
+                    dtype=np.float32
+                )
+
+            slot = self._semcache_count % self._semcache_size
+            self._semcache_keys[slot] = question_vec
+            self._semcache_times[slot] = time.time()
+            self._semcache_k[slot] = k
+            self._semcache_vals[slot] = result
+            self._semcache_count += 1
+
     def query_with_cost_tracking(self, question: str, k: Optional[int] = None) -> Dict:
         """
         Query with detailed cost tracking
@@ -152,32 +543,54 @@ Context:
             Response dict with added cost information
         """
         result = self.query(question, k=k, return_sources=True)
+        result['cost'] = self.estimate_cost(result.get('tokens_used', {}))
+        result['cost']['static_prompt_tokens'] = self.static_prompt_tokens
 
-        # Calculate costs
-        tokens = result.get('tokens_used', {})
+        return result
+
+    @staticmethod
+    def _token_counts(tokens: Dict) -> Tuple[int, int, int]:
+        """Split an OpenAI token_usage dict into (fresh input, cached input, output)"""
         prompt_tokens = tokens.get('prompt_tokens', 0)
-        completion_tokens = tokens.get('completion_tokens', 0)
+        cached_tokens = (tokens.get('prompt_tokens_details') or {}).get('cached_tokens', 0)
+        return prompt_tokens - cached_tokens, cached_tokens, tokens.get('completion_tokens', 0)
+
+    @staticmethod
+    def estimate_cost(tokens: Dict) -> Dict:
+        """Price an OpenAI token_usage dict"""
+        fresh_tokens, cached_tokens, completion_tokens = RAGChain._token_counts(tokens)
+        prompt_tokens = fresh_tokens + cached_tokens
 
-        # WHY: GPT-4o-mini pricing (as of Jan 2026)
-        # Input: $0.15 per 1M tokens
-        # Output: $0.60 per 1M tokens
-        input_cost = (prompt_tokens / 1_000_000) * 0.15
-        output_cost = (completion_tokens / 1_000_000) * 0.60
+        input_cost = fresh_tokens * TOKEN_PRICES[0] + cached_tokens * TOKEN_PRICES[1]
+        output_cost = completion_tokens * TOKEN_PRICES[2]
         total_cost = input_cost + output_cost
 
-        result['cost'] = {
+        logger.info("Query cost: ${:.6f} USD", total_cost)
+
+        return {
             'prompt_tokens': prompt_tokens,
+            'cached_tokens': cached_tokens,
             'completion_tokens': completion_tokens,
             'total_tokens': prompt_tokens + completion_tokens,
-            'input_cost_usd': round(input_cost, 6),
-            'output_cost_usd': round(output_cost, 6),
-            'total_cost_usd': round(total_cost, 6)
+            # WHY: Raw floats - callers format for display at render time
+            'input_cost_usd': float(input_cost),
+            'output_cost_usd': float(output_cost),
+            'total_cost_usd': float(total_cost)
         }
 
-        logger.info(f"Query cost: ${total_cost:.6f} USD")
-
-        return result
+    @staticmethod
+    def estimate_costs(token_usages: List[Dict]) -> np.ndarray:
+        """
+        Total cost in USD for each token_usage dict of a batch
 
+        WHY: One (N, 3) @ (3,) product prices the whole batch instead of
+             per-query Python arithmetic
+        """
+        counts = np.array(
+            [RAGChain._token_counts(tokens) for tokens in token_usages],
+            dtype=np.float64
+        ).reshape(-1, 3)
+        return counts @ TOKEN_PRICES
 
 # ====================
 # USAGE EXAMPLE
@@ -206,20 +619,17 @@ if __name__ == "__main__":
         "What is deep learning?",  # Not in our docs - should say "don't know"
     ]
 
-    total_cost = 0.0
+    # WHY: All questions run concurrently - wall time ~ the slowest one
+    start_time = time.time()
+    results = asyncio.run(rag.abatch_query(test_questions, k=3))
+    elapsed = time.time() - start_time
+    costs = rag.estimate_costs([result.get('tokens_used', {}) for result in results])
 
-    for i, question in enumerate(test_questions, 1):
+    for i, (question, result) in enumerate(zip(test_questions, results), 1):
         print(f"\n{'='*70}")
         print(f"Question {i}/{len(test_questions)}: {question}")
         print(f"{'='*70}\n")
 
-        start_time = time.time()
-
-        # Get answer with cost tracking
-        result = rag.query_with_cost_tracking(question, k=3)
-
-        elapsed = time.time() - start_time
-
         # Display answer
         print(f"Answer:\n{result['answer']}\n")
 
@@ -228,18 +638,17 @@ if __name__ == "__main__":
         for j, source in enumerate(result.get('sources', []), 1):
             print(f"  {j}. {source['file']}, page {source['page']}")
 
-        # Display performance
-        cost_info = result['cost']
-        total_cost += cost_info['total_cost_usd']
+        # Display cost
+        tokens = result.get('tokens_used', {})
+
+        print(f"\nTokens: {tokens.get('total_tokens', 0)} "
+              f"(prompt: {tokens.get('prompt_tokens', 0)}, "
+              f"completion: {tokens.get('completion_tokens', 0)})")
+        print(f"Cost: ${costs[i - 1]:.6f} USD")
 
-        print(f"\nPerformance:")
-        print(f"  Time: {elapsed:.2f}s")
-        print(f"  Tokens: {cost_info['total_tokens']} "
-              f"(prompt: {cost_info['prompt_tokens']}, "
-              f"completion: {cost_info['completion_tokens']})")
-        print(f"  Cost: ${cost_info['total_cost_usd']:.6f} USD")
+    total_cost = costs.sum()
 
     print(f"\n{'='*70}")
-    print(f"All questions processed!")
+    print(f"All questions processed in {elapsed:.2f}s!")
     print(f"Total cost: ${total_cost:.6f} USD")
     print(f"Average cost per query: ${total_cost/len(test_questions):.6f} USD")
@@ -5,24 +5,89 @@ Purpose: Retrieve relevant documents for a given query
 CV Mapping: Information retrieval, semantic search, ranking algorithms
 """
 
-from typing import List, Dict, Optional, Any
-# from langchain.schema import Document
-try:
-    from langchain.schema import Document
-except ImportError:
-    try:
-        from langchain_core.schema import Document
-    except ImportError:
-        try:
-            from langchain.docstore.document import Document
-        except ImportError:
-            Document = Any
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Dict, Optional, Tuple
+import numpy as np
 from src.vector_store import VectorStoreManager
 from src.utils.logger import get_logger
 from src.utils.config import settings
+from src.utils.compat import get_document_cls
+
+Document = get_document_cls()
+
+try:
+    from numba import njit
+except ImportError:  # WHY: Optional - the NumPy path below is the fallback
+    njit = None
 
 logger = get_logger(__name__)
 
+# WHY: Bounded so a long-running Streamlit process cannot grow without limit
+EMBEDDING_CACHE_SIZE = 1024
+
+
+# WHY: Largest result count that gets an unrolled context formatter;
+#      bigger (rerank-sized) results use the generic join
+MAX_UNROLLED_DOCS = 16
+
+# WHY: n -> generated formatter, shared by every Retriever in the process
+_FORMATTERS: Dict[int, Callable[[List[Document]], str]] = {}
+
+
+def _make_formatter(n: int) -> Callable[[List[Document]], str]:
+    """
+    Generate a context formatter specialized for exactly n documents
+
+    WHY: With k fixed, the per-document loop, enumerate and generator
+         frames are pure overhead; the generated body is one unrolled
+         f-string per document joined in a single call
+    """
+    lines = ["def _format(docs):"]
+    entries = []
+    for i in range(n):
+        lines.append(f"    m{i} = docs[{i}].metadata")
+        entries.append(
+            f"f\"[Source {i + 1}: {{m{i}.get('source_file', 'unknown')}}, "
+            f"page {{m{i}.get('page', 'N/A')}}]\\n{{docs[{i}].page_content.strip()}}\""
+        )
+    lines.append(f"    return '\\n\\n---\\n\\n'.join(({', '.join(entries)},))")
+
+    namespace = {}
+    exec("\n".join(lines), namespace)
+    return namespace["_format"]
+
+
+def _get_formatter(n: int) -> Callable[[List[Document]], str]:
+    """Formatter for n documents, generated on first use"""
+    formatter = _FORMATTERS.get(n)
+    if formatter is None:
+        formatter = _FORMATTERS.setdefault(n, _make_formatter(n))
+    return formatter
+
+
+def _filter_scores(scores: np.ndarray, threshold: float) -> np.ndarray:
+    """Indices of scores at or above threshold, in their original order"""
+    return np.flatnonzero(scores >= threshold)
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _filter_scores(scores, threshold):
+        # WHY: One pass without the temporary boolean mask; cache=True keeps
+        #      the compiled version on disk so only the first process pays
+        keep = np.empty(scores.shape[0], dtype=np.int64)
+        n = 0
+        for i in range(scores.shape[0]):
+            if scores[i] >= threshold:
+                keep[n] = i
+                n += 1
+        return keep[:n]
+
+    # WHY: Compile at import so the first real query never waits on it
+    _filter_scores(np.zeros(1, dtype=np.float32), 0.0)
+
 
 class Retriever:
     """
@@ -53,8 +118,82 @@ class Retriever:
                     "No vector store found. Run src/vector_store.py first to create it."
                 )
 
+        # WHY: Read once - every retrieve* call falls back to it
+        self._default_k = settings.top_k_results
+
+        # WHY: Generate the formatter for the usual result size up front
+        if self._default_k <= MAX_UNROLLED_DOCS:
+            _get_formatter(self._default_k)
+
+        # STEP 2: Cache query embeddings
+        # WHY: LRU of query -> embedding; repeated and history-replayed
+        #      questions skip the embeddings API. Per instance so the cache
+        #      follows this embedding model
+        self._embedding_cache: "OrderedDict[str, Tuple[float, ...]]" = OrderedDict()
+        self._embedding_cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+
         logger.info("Retriever initialized")
 
+    def embed_query(self, query: str) -> List[float]:
+        """Embed a query, reusing the cached embedding for repeated strings"""
+        return self.embed_queries([query])[0]
+
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """
+        Embed many queries, sending only cache misses in one request
+
+        WHY: The embeddings endpoint accepts a list - N questions cost one
+             round-trip instead of N
+        """
+        found, misses = self._lookup_embeddings(queries)
+
+        if misses:
+            embeddings = self.vector_manager.embeddings.embed_documents(misses)
+            for query, embedding in zip(misses, embeddings):
+                # WHY: Tuples so cached values can't be mutated by callers
+                found[query] = tuple(embedding)
+                self._store_embedding(query, found[query])
+
+        return [list(found[query]) for query in queries]
+
+    def _lookup_embeddings(self, queries: List[str]) -> Tuple[Dict[str, Tuple[float, ...]], List[str]]:
+        """Split queries into cached embeddings and unique misses"""
+        found = {}
+        misses = []
+
+        with self._embedding_cache_lock:
+            for query in dict.fromkeys(queries):
+                embedding = self._embedding_cache.get(query)
+
+                if embedding is None:
+                    misses.append(query)
+                else:
+                    self._embedding_cache.move_to_end(query)
+                    found[query] = embedding
+
+            self._cache_hits += len(found)
+            self._cache_misses += len(misses)
+
+        return found, misses
+
+    def _store_embedding(self, query: str, embedding: Tuple[float, ...]):
+        """Insert into the LRU, evicting the least recently used entry"""
+        with self._embedding_cache_lock:
+            self._embedding_cache[query] = embedding
+            if len(self._embedding_cache) > EMBEDDING_CACHE_SIZE:
+                self._embedding_cache.popitem(last=False)
+
+    def cache_stats(self) -> Dict:
+        """Query embedding cache statistics"""
+        return {
+            "hits": self._cache_hits,
+            "misses": self._cache_misses,
+            "size": len(self._embedding_cache),
+            "max_size": EMBEDDING_CACHE_SIZE
+        }
+
     def retrieve(self, query: str, k: Optional[int] = None) -> List[Document]:
         """
         Retrieve relevant documents for query
@@ -68,17 +207,54 @@ class Retriever:
         Returns:
             List of relevant documents
         """
-        k = k or settings.top_k_results
+        k = k or self._default_k
 
-        logger.info(f"Retrieving documents for query: '{query[:50]}...'")
+        logger.info("Retrieving documents for query: '{}...'", query[:50])
 
-        # STEP 1: Perform similarity search
-        results = self.vector_manager.similarity_search(query, k=k)
+        # STEP 1: Embed query (cached)
+        query_embedding = self.embed_query(query)
 
-        logger.info(f"Retrieved {len(results)} documents")
+        # STEP 2: Perform similarity search
+        results = self.vector_manager.similarity_search_by_vector(query_embedding, k=k)
+
+        logger.info("Retrieved {} documents", len(results))
 
         return results
 
+    def retrieve_batch(self, queries: List[str], k: Optional[int] = None) -> List[List[Document]]:
+        """
+        Retrieve documents for many queries at once
+
+        WHY: One embeddings request for all cache misses and one FAISS
+             search over the (n_queries, dim) matrix
+
+        Returns:
+            One list of documents per query, in query order
+        """
+        if not queries:
+            return []
+
+        k = k or self._default_k
+
+        logger.info("Retrieving documents for {} queries", len(queries))
+
+        results = self.vector_manager.similarity_search_by_vectors(
+            self.embed_queries(queries), k=k
+        )
+
+        logger.opt(lazy=True).info("Retrieved {} documents", lambda: sum(len(docs) for docs in results))
+
+        return results
+
+    async def aretrieve(self, query: str, k: Optional[int] = None) -> List[Document]:
+        """
+        Async version of retrieve
+
+        WHY: FAISS search and the embeddings client are blocking; a worker
+             thread lets several queries retrieve concurrently
+        """
+        return await asyncio.to_thread(self.retrieve, query, k)
+
     def retrieve_with_scores(self, query: str, k: Optional[int] = None) -> List[tuple]:
         """
         Retrieve documents with relevance scores
@@ -88,11 +264,13 @@ class Retriever:
         Returns:
             List of (Document, score) tuples
         """
-        k = k or settings.top_k_results
+        k = k or self._default_k
 
-        results = self.vector_manager.similarity_search_with_score(query, k=k)
+        results = self.vector_manager.similarity_search_with_score_by_vector(
+            self.embed_query(query), k=k
+        )
 
-        logger.info(f"Retrieved {len(results)} documents with scores")
+        logger.info("Retrieved {} documents with scores", len(results))
 
         return results
 
@@ -115,22 +293,42 @@ class Retriever:
         Returns:
             List of documents above threshold
         """
-        k = k or settings.top_k_results
+        k = k or self._default_k
+
+        if self.vector_manager.supports_radius_search():
+            # WHY: The index returns only documents above the threshold
+            filtered_results = [
+                doc for doc, _ in self.vector_manager.similarity_search_by_radius(
+                    self.embed_query(query), radius=score_threshold, k=k
+                )
+            ]
+            logger.info("Retrieved {} documents above threshold {}", len(filtered_results), score_threshold)
+            return filtered_results
 
         # Get results with scores
         results_with_scores = self.retrieve_with_scores(query, k=k)
 
+        if not results_with_scores:
+            return []
+
         # Filter by threshold
-        # WHY: FAISS returns distance (lower = more similar)
-        #      Threshold filters documents above minimum relevance
-        filtered_results = [
-            doc for doc, score in results_with_scores
-            if score >= score_threshold
-        ]
-
-        logger.info(
-            f"Filtered to {len(filtered_results)}/{len(results_with_scores)} "
-            f"documents above threshold {score_threshold}"
+        # WHY: Scores are cosine similarities (normalized inner-product index)
+        #      Threshold filters documents above minimum relevance.
+        #      One vectorized comparison instead of a Python loop, so large
+        #      k (retrieve-then-rerank) stays cheap
+        scores = np.fromiter(
+            (score for _, score in results_with_scores),
+            dtype=np.float32,
+            count=len(results_with_scores)
+        )
+        keep = _filter_scores(scores, score_threshold)
+        filtered_results = [results_with_scores[i][0] for i in keep]
+
+        logger.opt(lazy=True).info(
+            "Filtered to {}/{} documents above threshold {}",
+            lambda: len(filtered_results),
+            lambda: len(results_with_scores),
+            lambda: score_threshold
         )
 
         return filtered_results
@@ -150,22 +348,19 @@ class Retriever:
         if not documents:
             return "No relevant documents found."
 
-        context_parts = []
-
-        for i, doc in enumerate(documents, 1):
-            source = doc.metadata.get('source_file', 'unknown')
-            page = doc.metadata.get('page', 'N/A')
-            content = doc.page_content.strip()
-
-            # Format: [Source 1: filename.pdf, page 3]
-            # Content here...
-            context_part = f"[Source {i}: {source}, page {page}]\n{content}"
-            context_parts.append(context_part)
-
-        # WHY: Separate sources with clear delimiters
-        formatted_context = "\n\n---\n\n".join(context_parts)
-
-        return formatted_context
+        # Format: [Source 1: filename.pdf, page 3]
+        # Content here...
+        if len(documents) <= MAX_UNROLLED_DOCS:
+            return _get_formatter(len(documents))(documents)
+
+        # WHY: Separate sources with clear delimiters; a single generator
+        #      feeds join, so no intermediate list of parts is built
+        return "\n\n---\n\n".join(
+            f"[Source {i}: {metadata.get('source_file', 'unknown')}, page {metadata.get('page', 'N/A')}]\n{content}"
+            for i, (metadata, content) in enumerate(
+                ((doc.metadata, doc.page_content.strip()) for doc in documents), 1
+            )
+        )
 
     def get_retrieval_stats(self, documents: List[Document]) -> Dict:
         """Get statistics about retrieved documents"""
@@ -207,14 +402,14 @@ if __name__ == "__main__":
         "What are common ML evaluation metrics?"
     ]
 
-    for query in test_queries:
+    # Retrieve documents for every query in one batched search
+    batch_documents = retriever.retrieve_batch(test_queries, k=3)
+
+    for query, documents in zip(test_queries, batch_documents):
         print(f"\n{'='*60}")
         print(f"Query: {query}")
         print(f"{'='*60}")
 
-        # Retrieve documents
-        documents = retriever.retrieve(query, k=3)
-
         # Show stats
         stats = retriever.get_retrieval_stats(documents)
         print(f"\nRetrieved: {stats['count']} documents")
@@ -14,10 +14,15 @@ sys.path.insert(0, str(project_root))
 
 import streamlit as st
 import time
+from typing import Optional, Tuple
 from src.document_loader import DocumentLoader
 from src.embedding_pipeline import EmbeddingPipeline
 from src.vector_store import VectorStoreManager
+from src.retriever import Retriever
 from src.rag_chain import RAGChain
+from src.utils.config import settings
+
+DATA_DIR = "data/sample"
 
 # Page config
 st.set_page_config(
@@ -37,15 +42,73 @@ if 'total_cost' not in st.session_state:
     st.session_state.total_cost = 0.0
 
 
+def _index_version() -> float:
+    """Modification time of the saved FAISS index (0 if none)"""
+    index_file = Path(settings.vector_store_path) / "index.faiss"
+    return index_file.stat().st_mtime if index_file.exists() else 0.0
+
+
+def _pdf_fingerprint() -> Tuple:
+    """(name, size, mtime) for every PDF - changes whenever a PDF does"""
+    return tuple(
+        (p.name, p.stat().st_size, p.stat().st_mtime)
+        for p in sorted(Path(DATA_DIR).glob("*.pdf"))
+    )
+
+
+@st.cache_resource(max_entries=1, show_spinner="Loading document index...")
+def get_rag_chain(index_version: float) -> Optional[RAGChain]:
+    """
+    Load the FAISS index and build the RAG chain once per index version
+
+    WHY: Streamlit reruns the script on every interaction; caching keeps
+         the index, embeddings client and LLM resident across reruns and
+         sessions. Keyed on the index mtime so a rebuilt index reloads
+    """
+    vector_manager = VectorStoreManager()
+    if not vector_manager.load_vectorstore():
+        return None
+
+    return RAGChain(retriever=Retriever(vector_manager=vector_manager))
+
+
+@st.cache_resource(max_entries=1, show_spinner="Processing documents...")
+def build_index(pdf_fingerprint: Tuple) -> dict:
+    """
+    Load, chunk, embed and index the PDFs in DATA_DIR
+
+    WHY: Keyed on the PDF fingerprint so re-processing only runs when the
+         PDFs actually changed
+    """
+    # Load documents
+    loader = DocumentLoader(data_dir=DATA_DIR)
+    documents = loader.load_documents()
+
+    if not documents:
+        return {}
+
+    # Chunk documents
+    pipeline = EmbeddingPipeline()
+    chunks = pipeline.chunk_documents(documents)
+
+    # Create vector store
+    vector_manager = VectorStoreManager()
+    # vector_manager.delete_collection()  # Clear old data
+    vector_manager.delete_index()  # Clear old data
+    vector_manager.create_vectorstore(chunks, embeddings=pipeline.embed_chunks(chunks))
+
+    stats = loader.get_document_stats(documents)
+    stats["total_chunks"] = len(chunks)
+    return stats
+
+
 def initialize_rag_system():
     """Initialize or load RAG system"""
     try:
-        # Try to load existing vector store
-        vector_manager = VectorStoreManager()
-        loaded = vector_manager.load_vectorstore()
+        rag_chain = get_rag_chain(_index_version())
 
-        if loaded:
-            st.session_state.rag_chain = RAGChain()
+        if rag_chain is not None:
+            st.session_state.rag_chain = rag_chain
             st.session_state.documents_loaded = True
             return True, "Loaded existing document collection"
         else:
@@ -57,35 +120,24 @@ def initialize_rag_system():
 
 def process_documents():
     """Process uploaded documents and create vector store"""
-    with st.spinner("Processing documents..."):
-        # Load documents
-        loader = DocumentLoader(data_dir="data/sample")
-        documents = loader.load_documents()
-
-        if not documents:
-            return False, "No PDF files found in data/sample/"
-
-        # Chunk documents
-        pipeline = EmbeddingPipeline()
-        chunks = pipeline.chunk_documents(documents)
+    # WHY: Rebuild even for unchanged PDFs if the index was removed from disk
+    if not _index_version():
+        build_index.clear()
 
-        # Create vector store
-        vector_manager = VectorStoreManager()
-        # vector_manager.delete_collection()  # Clear old data
-        vector_manager.delete_index()  # Clear old data
-        vector_manager.create_vectorstore(chunks)
+    stats = build_index(_pdf_fingerprint())
 
-        # Initialize RAG chain
-        st.session_state.rag_chain = RAGChain()
-        st.session_state.documents_loaded = True
+    if not stats:
+        return False, f"No PDF files found in {DATA_DIR}/"
 
-        stats = loader.get_document_stats(documents)
+    # Initialize RAG chain
+    st.session_state.rag_chain = get_rag_chain(_index_version())
+    st.session_state.documents_loaded = True
 
-        return True, f"""
+    return True, f"""
         Successfully processed documents:
         - Documents: {stats['total_docs']}
         - Files: {len(stats['files'])}
-        - Chunks created: {len(chunks)}
+        - Chunks created: {stats['total_chunks']}
         """
 
 
@@ -174,29 +226,29 @@ def main():
 
         if st.button("Get Answer", type="primary"):
             if question:
-                with st.spinner("Searching documents and generating answer..."):
-                    start_time = time.time()
-
-                    # Get answer
-                    result = st.session_state.rag_chain.query_with_cost_tracking(
-                        question, k=k_results
-                    )
-
-                    elapsed = time.time() - start_time
-
-                    # Update stats
-                    st.session_state.total_cost += result['cost']['total_cost_usd']
-                    st.session_state.query_history.append({
-                        'question': question,
-                        'answer': result['answer'],
-                        'cost': result['cost']['total_cost_usd'],
-                        'time': elapsed
-                    })
-
                 # Display answer
                 st.markdown("---")
                 st.subheader("Answer")
-                st.markdown(result['answer'])
+
+                start_time = time.time()
+
+                # WHY: Render tokens as they arrive instead of after the full completion
+                result = {}
+                st.write_stream(
+                    st.session_state.rag_chain.query_stream(question, k=k_results, result=result)
+                )
+                result['cost'] = RAGChain.estimate_cost(result.get('tokens_used', {}))
+
+                elapsed = time.time() - start_time
+
+                # Update stats
+                st.session_state.total_cost += result['cost']['total_cost_usd']
+                st.session_state.query_history.append({
+                    'question': question,
+                    'answer': result['answer'],
+                    'cost': result['cost']['total_cost_usd'],
+                    'time': elapsed
+                })
 
                 # Display sources
                 st.markdown("---")
@@ -0,0 +1,59 @@
+"""
+LangChain Compatibility
+Purpose: Resolve classes whose import location moved between LangChain releases
+"""
+
+import importlib
+from functools import lru_cache
+from typing import Any, Optional, Sequence
+
+# WHY: Current location first - on a supported install the first probe
+#      succeeds and no failing import is ever executed
+DOCUMENT_MODULES = (
+    "langchain_core.documents",
+    "langchain.schema",
+    "langchain_core.schema",
+    "langchain.docstore.document",
+)
+
+SPLITTER_MODULES = (
+    "langchain_text_splitters",
+    "langchain.text_splitters",
+    "langchain.text_splitter",
+)
+
+
+def _find_class(modules: Sequence[str], name: str) -> Optional[type]:
+    """Return `name` from the first module that provides it"""
+    for module in modules:
+        try:
+            return getattr(importlib.import_module(module), name)
+        except (ImportError, AttributeError):
+            continue
+    return None
+
+
+@lru_cache(maxsize=1)
+def get_document_cls():
+    """
+    Resolve LangChain's Document class once per process
+
+    WHY: Used for type hints only, so fall back to Any without LangChain
+    """
+    return _find_class(DOCUMENT_MODULES, "Document") or Any
+
+
+@lru_cache(maxsize=1)
+def get_splitter_cls():
+    """Resolve RecursiveCharacterTextSplitter once per process"""
+    splitter_cls = _find_class(SPLITTER_MODULES, "RecursiveCharacterTextSplitter")
+
+    if splitter_cls is None:
+        raise ImportError(
+            "RecursiveCharacterTextSplitter cannot be imported. "
+            "Install langchain-text-splitters (e.g. "
+            "`pip install langchain-text-splitters==1.1.1`) or pin a "
+            "compatible LangChain release in requirements.txt."
+        )
+
+    return splitter_cls
@@ -4,36 +4,82 @@ Purpose: Load and validate environment variables
 """
 
 import os
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
+import httpx
 from dotenv import load_dotenv
-from pydantic import BaseModel, Field
 
 # Load environment variables
 load_dotenv()
 
-class Settings(BaseModel):
-    """Application settings"""
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """
+    Application settings
+
+    WHY: Static config read on every request - a frozen slots dataclass
+         makes attribute reads plain slot loads
+    """
     
     # OpenAI
-    openai_api_key: str = Field(default_factory=lambda: os.getenv("OPENAI_API_KEY", ""))
-    embedding_model: str = Field(default="text-embedding-3-small")
-    llm_model: str = Field(default="gpt-4o-mini")
-    llm_temperature: float = Field(default=0.0)
+    openai_api_key: str = field(default_factory=lambda: os.getenv("OPENAI_API_KEY", ""))
+    embedding_model: str = "text-embedding-3-small"
+    llm_model: str = "gpt-4o-mini"
+    llm_temperature: float = 0.0
     
     # Vector Store
-    vector_store_path: str = Field(default="./data/processed/faiss_index")
-    collection_name: str = Field(default="document_collection")
+    vector_store_path: str = "./data/processed/faiss_index"
+    collection_name: str = "document_collection"
     
     # Chunking
-    chunk_size: int = Field(default=1000)
-    chunk_overlap: int = Field(default=200)
+    chunk_size: int = 1000
+    chunk_overlap: int = 200
     
     # Retrieval
-    top_k_results: int = Field(default=4)
+    top_k_results: int = 4
+    
+    # Vector index
+    # WHY: auto | flat | sq8 | hnsw_sq8 | ivf_sq8 | ivf_pq | opq_ivfpq_hnsw -
+    #      trade memory and recall per deployment without code changes
+    index_type: str = field(default_factory=lambda: os.getenv("INDEX_TYPE", "auto"))
+    # WHY: With index_type=auto, corpora this large switch from HNSW to an
+    #      IVF-PQ index, which stores compact PQ codes instead of full vectors
+    ivf_min_vectors: int = 10_000
+    ivf_nlist: Optional[int] = None  # None -> 4 * sqrt(n_vectors), at most n_vectors // 39
+    pq_m: int = 32                   # sub-quantizers; must divide the embedding dim
+    pq_nbits: int = 8
+    ivf_nprobe: int = 8              # inverted lists scanned per query
+    rerank_factor: int = 4           # candidates per result re-scored exactly; 1 disables
+    # WHY: OpenMP threads FAISS uses to split batched searches over queries
+    faiss_threads: int = field(default_factory=lambda: int(os.getenv("FAISS_THREADS", os.cpu_count() or 1)))
+    faiss_prefetch_nthreads: int = 4  # read-ahead threads for memory-mapped IVF lists larger than RAM
+    # WHY: Save IVF inverted lists to their own file, paged in on demand at
+    #      search time instead of loaded with the rest of the index
+    ivf_on_disk: bool = field(default_factory=lambda: os.getenv("IVF_ON_DISK", "true").lower() in ("1", "true"))
+    # WHY: Search on GPU 0 when faiss-gpu is installed (large corpora only)
+    use_gpu: bool = field(default_factory=lambda: os.getenv("USE_GPU", "").lower() in ("1", "true"))
+    # WHY: IVF only - centroid search on GPU, inverted lists stay in host memory
+    use_gpu_coarse: bool = field(default_factory=lambda: os.getenv("USE_GPU_COARSE", "").lower() in ("1", "true"))
+    
+    # Semantic response cache
+    # WHY: Rephrased repeat questions reuse the stored answer instead of
+    #      paying for retrieval + an LLM call
+    semantic_cache_enabled: bool = True
+    semantic_cache_threshold: float = 0.92  # cosine similarity
+    semantic_cache_size: int = 256
+    semantic_cache_ttl_seconds: float = 3600.0
+    
+    # Loading
+    # WHY: Worker processes for PDF parsing; lower it where the PDF backend
+    #      already uses native threads
+    loader_workers: int = field(default_factory=lambda: int(os.getenv("LOADER_WORKERS", os.cpu_count() or 1)))
     
     # Application
-    log_level: str = Field(default="INFO")
-    max_tokens: int = Field(default=2000)
+    # WHY: Level of both the console and the logs/rag_poc_*.log file sink
+    log_level: str = field(default_factory=lambda: os.getenv("LOG_LEVEL", "INFO").upper())
+    max_tokens: int = 2000
     
     def validate_api_key(self) -> bool:
         """Validate OpenAI API key exists"""
@@ -46,3 +92,17 @@ class Settings(BaseModel):
 
 # Global settings instance
 settings = Settings()
+
+
+@lru_cache(maxsize=1)
+def get_shared_http_client() -> httpx.Client:
+    """
+    HTTP client shared by the chat model and the embeddings model
+
+    WHY: One keep-alive pool per process - query embedding and the LLM call
+         reuse warm TLS connections instead of each client opening its own
+    """
+    return httpx.Client(
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+        timeout=httpx.Timeout(30.0, connect=5.0)
+    )
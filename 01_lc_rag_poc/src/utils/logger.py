@@ -18,11 +18,14 @@ logger.add(
 )
 
 # Add file handler
+# WHY: Same level as the console - a DEBUG sink would make loguru format
+#      every debug message, so lazy log calls on the query path would never
+#      be skipped. LOG_LEVEL=DEBUG puts the debug detail in the file too
 logger.add(
     "logs/rag_poc_{time:YYYY-MM-DD}.log",
     rotation="1 day",
     retention="7 days",
-    level="DEBUG"
+    level=settings.log_level
 )
 
 def get_logger(name: str):
@@ -15,19 +15,19 @@ def create_test_pdf(filename: str, content: str, num_pages: int = 3):
     pdf_path = output_dir / filename
     c = canvas.Canvas(str(pdf_path), pagesize=letter)
     
+    # Build content once
+    # WHY: Every page repeats the same text - textLines emits all lines in
+    #      one call and the text object is reused for each page. A list with
+    #      trim=0 keeps lines exactly as written (a str would be stripped)
+    text_object = c.beginText(50, 700)
+    text_object.setFont("Helvetica", 12)
+    text_object.textLines(content.split('\n'), trim=0)
+    
     for page_num in range(num_pages):
         # Add page number
         c.drawString(50, 750, f"Page {page_num + 1} of {num_pages}")
         
         # Add content
-        text_object = c.beginText(50, 700)
-        text_object.setFont("Helvetica", 12)
-        
-        # Split content into lines
-        lines = content.split('\n')
-        for line in lines:
-            text_object.textLine(line)
-        
         c.drawText(text_object)
         c.showPage()
     
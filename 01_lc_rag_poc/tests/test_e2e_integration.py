@@ -11,9 +11,10 @@ Tests:
 """
 
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from src.document_loader import DocumentLoader
-from src.embedding_pipeline import EmbeddingPipeline
+from src.embedding_pipeline import EmbeddingPipeline, EMBED_MAX_WORKERS
 from src.vector_store import VectorStoreManager
 from src.retriever import Retriever
 from src.rag_chain import RAGChain
@@ -27,15 +28,24 @@ class TestE2EIntegration:
         """Setup complete RAG pipeline"""
         print("\n🔧 Setting up RAG pipeline...")
 
-        # 1. Load documents
+        # 1-2. Load, chunk and embed documents
+        # WHY: Each 64-chunk batch is embedded in the background while the
+        #      next batches are chunked and the next files are still loading
         loader = DocumentLoader(data_dir="data/sample")
-        documents = loader.load_documents()
+        pipeline = EmbeddingPipeline()
+
+        documents, chunks, futures = [], [], []
+        with ThreadPoolExecutor(max_workers=EMBED_MAX_WORKERS) as executor:
+            for file_documents in loader.iter_documents():
+                documents.extend(file_documents)
+                for batch in pipeline.iter_chunk_batches(file_documents, start_id=len(chunks)):
+                    chunks.extend(batch)
+                    futures.append(executor.submit(pipeline.embed_texts, [c.page_content for c in batch]))
+
+            embeddings = [vector for future in futures for vector in future.result()]
+
         assert len(documents) > 0, "No documents loaded"
         print(f"Loaded {len(documents)} documents")
-
-        # 2. Chunk documents
-        pipeline = EmbeddingPipeline()
-        chunks = pipeline.chunk_documents(documents)
         assert len(chunks) > 0, "No chunks created"
         print(f"Created {len(chunks)} chunks")
 
@@ -43,7 +53,7 @@ class TestE2EIntegration:
         vector_manager = VectorStoreManager()
         # vector_manager.delete_collection()  # Clean slate
         vector_manager.delete_index()  # Clear old data
-        vectorstore = vector_manager.create_vectorstore(chunks)
+        vectorstore = vector_manager.create_vectorstore(chunks, embeddings=embeddings)
         assert vectorstore is not None, "Vector store creation failed"
         print(f"Vector store created")
 
@@ -0,0 +1,41 @@
+"""
+Test int8 quantization and candidate reranking
+"""
+
+import numpy as np
+
+from src.fast_cosine import cosine_scores, quantize_int8, rerank
+
+
+def unit_vectors(n, dim=32, seed=0):
+    vectors = np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_quantize_int8_round_trips_within_one_step():
+    vectors = unit_vectors(50)
+
+    codes, scales = quantize_int8(vectors)
+
+    assert codes.dtype == np.int8
+    np.testing.assert_allclose(codes / scales[:, None], vectors, atol=0.5 / scales.min())
+
+
+def test_cosine_scores_match_matrix_product():
+    vectors = unit_vectors(20)
+
+    np.testing.assert_allclose(cosine_scores(vectors[0], vectors), vectors @ vectors[0], rtol=1e-5)
+
+
+def test_rerank_orders_candidates_and_pads():
+    vectors = unit_vectors(100)
+    codes, scales = quantize_int8(vectors)
+    queries = vectors[[7, 42]]
+    candidates = np.array([[3, 7, 9, -1], [-1, -1, -1, -1]])
+
+    scores, indices = rerank(queries, candidates, codes, k=2, scales=scales)
+
+    assert indices[0, 0] == 7
+    assert scores[0, 0] > scores[0, 1]
+    assert indices[1].tolist() == [-1, -1]
+    assert np.isneginf(scores[1]).all()
@@ -0,0 +1,29 @@
+"""
+Test index_factory strings chosen for a corpus size
+"""
+
+import dataclasses
+import re
+
+import pytest
+
+import src.vector_store as vector_store
+from src.vector_store import MIN_POINTS_PER_CENTROID, VectorStoreManager
+
+
+@pytest.mark.parametrize("n_vectors", [10_000, 20_000, 1_000_000])
+def test_auto_ivf_lists_get_enough_training_points(monkeypatch, n_vectors):
+    monkeypatch.setattr(vector_store, "settings", dataclasses.replace(vector_store.settings, index_type="auto", ivf_nlist=None))
+
+    factory = VectorStoreManager._index_factory(n_vectors)
+    nlist = int(re.search(r"IVF(\d+)", factory).group(1))
+
+    assert nlist * MIN_POINTS_PER_CENTROID <= n_vectors
+
+
+def test_auto_stays_on_hnsw_below_pq_training_minimum(monkeypatch):
+    monkeypatch.setattr(vector_store, "settings", dataclasses.replace(
+        vector_store.settings, index_type="auto", ivf_min_vectors=1_000, pq_nbits=8
+    ))
+
+    assert VectorStoreManager._index_factory(5_000).startswith("HNSW")
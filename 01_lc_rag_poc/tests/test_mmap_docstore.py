@@ -0,0 +1,61 @@
+"""
+Test the memory-mapped docstore
+"""
+
+import pickle
+
+from langchain_community.docstore.in_memory import InMemoryDocstore
+
+from src.mmap_docstore import IndexIds, MmapDocstore, write_docstore
+from src.utils.compat import get_document_cls
+
+Document = get_document_cls()
+
+
+def make_docstore(tmp_path, n=5) -> MmapDocstore:
+    documents = [Document(page_content=f"chunk {i} é", metadata={"page": i}) for i in range(n)]
+    write_docstore(tmp_path / "docs.bin", iter(documents), n)
+    return MmapDocstore(tmp_path / "docs.bin")
+
+
+def test_search_decodes_by_position(tmp_path):
+    docstore = make_docstore(tmp_path)
+
+    assert len(docstore) == 5
+    doc = docstore.search(3)
+    assert (doc.page_content, doc.metadata) == ("chunk 3 é", {"page": 3})
+    assert docstore.search(3) is doc  # WHY: Served from the materialized cache
+    docstore.close()
+
+
+def test_add_and_delete_switch_to_memory(tmp_path):
+    docstore = make_docstore(tmp_path)
+
+    docstore.add({"new": Document(page_content="added", metadata={})})
+    docstore.delete([0])
+
+    assert len(docstore) == 5
+    assert docstore.search("new").page_content == "added"
+    assert docstore.search(4).page_content == "chunk 4 é"
+    docstore.close()
+
+
+def test_pickles_as_in_memory_docstore(tmp_path):
+    docstore = make_docstore(tmp_path, n=3)
+
+    restored = pickle.loads(pickle.dumps(docstore))
+
+    assert isinstance(restored, InMemoryDocstore)
+    assert restored.search(2).page_content == "chunk 2 é"
+    docstore.close()
+
+
+def test_index_ids_become_a_dict_on_write():
+    ids = IndexIds(3)
+    assert list(ids.items()) == [(0, 0), (1, 1), (2, 2)]
+
+    ids[3] = "new"
+    del ids[0]
+
+    assert dict(ids) == {1: 1, 2: 2, 3: "new"}
+    assert pickle.loads(pickle.dumps(ids)) == {1: 1, 2: 2, 3: "new"}
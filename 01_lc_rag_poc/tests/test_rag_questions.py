@@ -14,14 +14,15 @@ def test_different_questions():
         "Off-topic": "What is the capital of France?",
     }
 
-    for q_type, question in questions.items():
+    # WHY: One embeddings request and one FAISS search for all questions
+    results = rag.batch_query(list(questions.values()), k=2)
+
+    for (q_type, question), result in zip(questions.items(), results):
         print(f"\n{'='*60}")
         print(f"Type: {q_type}")
         print(f"Q: {question}")
         print(f"{'='*60}")
 
-        result = rag.query(question, k=2)
-
         print(f"\nA: {result['answer'][:200]}...")
         print(f"\nSources: {result['num_sources']}")
 
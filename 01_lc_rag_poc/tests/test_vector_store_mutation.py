@@ -0,0 +1,102 @@
+"""
+Test adding to created and loaded vector stores
+
+WHY: Runs offline - hash-seeded embeddings stand in for the OpenAI model
+"""
+
+import dataclasses
+import hashlib
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+
+import src.vector_store as vector_store
+from src.utils.compat import get_document_cls
+from src.vector_store import VectorStoreManager
+
+Document = get_document_cls()
+
+DIM = 64
+
+
+class HashEmbeddings(Embeddings):
+    """Deterministic random unit-ish vectors keyed by the text"""
+
+    def _embed(self, text: str):
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        return np.random.default_rng(seed).standard_normal(DIM).astype(np.float32).tolist()
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+@pytest.fixture
+def use_settings(monkeypatch):
+    """Patch vector_store's settings and embeddings model for one test"""
+    monkeypatch.setattr(vector_store, "OpenAIEmbeddings", lambda **kwargs: HashEmbeddings())
+
+    def apply(**overrides):
+        monkeypatch.setattr(vector_store, "settings", dataclasses.replace(vector_store.settings, **overrides))
+
+    return apply
+
+
+def build_store(index_path, n_chunks: int) -> VectorStoreManager:
+    manager = VectorStoreManager(index_path=str(index_path))
+    chunks = [
+        Document(page_content=f"chunk {i}", metadata={"source_file": f"doc{i % 7}.pdf"})
+        for i in range(n_chunks)
+    ]
+    manager.create_vectorstore(chunks, embeddings=manager.embeddings.embed_documents([c.page_content for c in chunks]))
+    return manager
+
+
+def test_search_after_add_to_created_store(tmp_path, use_settings):
+    use_settings(index_type="hnsw_sq8", rerank_factor=4)
+    manager = build_store(tmp_path / "index", 300)
+
+    manager.vectorstore.add_texts(["added chunk"])
+    results = manager.similarity_search("added chunk", k=4)
+
+    assert results[0].page_content == "added chunk"
+
+
+def test_add_to_loaded_on_disk_ivf_store(tmp_path, use_settings):
+    use_settings(index_type="ivf_sq8", ivf_nlist=16, ivf_on_disk=True)
+    build_store(tmp_path / "index", 2000)
+
+    manager = VectorStoreManager(index_path=str(tmp_path / "index"))
+    manager.load_vectorstore()
+    manager.vectorstore.add_texts(["added chunk"])
+
+    assert manager.vectorstore.index.ntotal == 2001
+    assert manager.similarity_search("added chunk", k=4)[0].page_content == "added chunk"
+
+
+@pytest.mark.parametrize("overrides", [
+    {"index_type": "hnsw_sq8"},
+    {"index_type": "ivf_pq", "ivf_nlist": 16, "pq_m": 32, "pq_nbits": 4, "ivf_on_disk": True},
+], ids=["hnsw_sq8", "ivf_pq"])
+def test_loaded_store_round_trip(tmp_path, use_settings, overrides):
+    use_settings(rerank_factor=4, **overrides)
+    index_path = tmp_path / "index"
+    build_store(index_path, 2000)
+
+    manager = VectorStoreManager(index_path=str(index_path))
+    manager.load_vectorstore()
+    n_vectors = manager.vectorstore.index.ntotal
+    manager.vectorstore.add_texts(["added chunk"], metadatas=[{"source_file": "added.pdf"}])
+    assert manager.similarity_search("added chunk", k=4)[0].page_content == "added chunk"
+    manager.vectorstore.save_local(str(index_path))
+
+    reloaded = VectorStoreManager(index_path=str(index_path))
+    reloaded.load_vectorstore()
+
+    assert reloaded.vectorstore.index.ntotal == n_vectors + 1
+    top = reloaded.similarity_search("added chunk", k=4)[0]
+    assert (top.page_content, top.metadata["source_file"]) == ("added chunk", "added.pdf")
+    assert reloaded.similarity_search("chunk 5", k=4)[0].page_content == "chunk 5"
@@ -65,6 +65,50 @@ class Settings(BaseSettings):
         description="SendGrid API key for email (optional)"
     )
     
+    # LLM Request Batching
+    llm_max_batch: int = Field(
+        8,
+        description="Max chat completion requests dispatched together"
+    )
+    llm_max_wait_ms: int = Field(
+        20,
+        description="How long the first queued request waits for others to join its batch (0 = send immediately)"
+    )
+    llm_max_inflight_requests: int = Field(
+        32,
+        description="Max chat completion calls (incl. their tool-calling turns) awaiting the endpoint at once"
+    )
+    
+    # Conversation Memory
+    chat_history_max_messages: int = Field(
+        40,
+        description="Messages kept in the prompt; older ones are dropped in blocks"
+    )
+    memory_flush_ms: int = Field(
+        50,
+        description="Delay before buffered messages are written to Cosmos DB"
+    )
+    memory_flush_max_attempts: int = Field(
+        3,
+        description="Failed flushes a buffered message is retried for before it is dropped"
+    )
+    
+    # Agent Sessions
+    agent_cache_max_sessions: int = Field(
+        512,
+        description="Max agent sessions kept in memory per process"
+    )
+    agent_cache_ttl_seconds: int = Field(
+        1800,
+        description="Idle time after which an agent session is evicted"
+    )
+    
+    # Tool Execution
+    tool_concurrency_limit: int = Field(
+        16,
+        description="Max I/O-bound tool calls run at once across all agents"
+    )
+    
     # Application Insights (optional)
     appinsights_connection_string: Optional[str] = Field(
         None,
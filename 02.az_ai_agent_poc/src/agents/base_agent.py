@@ -3,8 +3,11 @@ Base Agent using Semantic Kernel
 Purpose: Core agent logic with ReAct loop and tool use
 """
 
-from typing import List, Dict, Optional
+from typing import AsyncIterator, List, Dict, Optional, Tuple
+from contextlib import aclosing
+from functools import lru_cache
 import asyncio
+import json
 from semantic_kernel import Kernel
 from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
 from semantic_kernel.connectors.ai.function_call_behavior import FunctionCallBehavior
@@ -14,11 +17,85 @@ from semantic_kernel.functions import KernelFunction
 
 from config.config import settings
 from config.logger import app_logger as logger
+from src.agents.batched_chat_service import BatchedChatService
+from src.agents.tool_executor import ParallelToolExecutor
 from src.memory.conversation_memory import ConversationMemory
 from src.tools.search_tool import SearchTool
 from src.tools.email_tool import EmailTool
 from src.tools.data_tool import DataAnalysisTool
 
+# WHY: Shared by every agent so concurrent sessions are batched together
+chat_batcher = BatchedChatService()
+
+
+def trim_chat_messages(messages: List, max_messages: int) -> int:
+    """
+    Drop the oldest messages once there are more than max_messages
+    
+    WHY: Every turn re-sends the whole history, so prompt tokens grow with
+         the conversation. Trimming down to half of max_messages in one
+         go - rather than sliding a window each turn - keeps the prompt
+         prefix identical between cuts, so Azure OpenAI's automatic prompt
+         caching still applies to it
+    
+    Args:
+        messages: Chat messages, oldest first (modified in place)
+        max_messages: Upper bound on kept messages
+        
+    Returns:
+        Number of messages removed
+    """
+    
+    if len(messages) <= max_messages:
+        return 0
+    
+    # WHY: Cut only before a user message, never between a tool call and its result
+    cut = len(messages) - max_messages // 2
+    while cut < len(messages) and messages[cut].role != "user":
+        cut += 1
+    
+    del messages[:cut]
+    return cut
+
+
+@lru_cache(maxsize=1)
+def get_shared_chat_service() -> AzureChatCompletion:
+    """
+    Azure OpenAI chat service shared by every agent
+    
+    WHY: Each AzureChatCompletion owns an HTTP client and connection pool;
+         one per process reuses connections across sessions
+    """
+    return AzureChatCompletion(
+        service_id="chat_completion",
+        deployment_name=settings.azure_openai_deployment,
+        endpoint=settings.azure_openai_endpoint,
+        api_key=settings.azure_openai_api_key
+    )
+
+
+@lru_cache(maxsize=1)
+def get_shared_tools() -> Tuple[SearchTool, EmailTool, DataAnalysisTool]:
+    """
+    Tool instances shared by every agent
+    
+    WHY: The tools keep no per-session state; one set of Tavily/SendGrid
+         clients serves all sessions instead of new clients per session
+    """
+    return SearchTool(), EmailTool(), DataAnalysisTool()
+
+
+@lru_cache(maxsize=1)
+def get_shared_tool_executor() -> ParallelToolExecutor:
+    """
+    Tool thread pool shared by every agent
+    
+    WHY: Agents are evicted from the session cache while requests may still
+         be using them; a process-wide pool is never shut down under them,
+         and it bounds tool threads for the whole process, not per session
+    """
+    return ParallelToolExecutor()
+
 
 class BaseAgent:
     """
@@ -46,20 +123,13 @@ class BaseAgent:
         self.kernel = Kernel()
         
         # WHY: Azure OpenAI service configuration
-        service_id = "chat_completion"
-        self.kernel.add_service(
-            AzureChatCompletion(
-                service_id=service_id,
-                deployment_name=settings.azure_openai_deployment,
-                endpoint=settings.azure_openai_endpoint,
-                api_key=settings.azure_openai_api_key
-            )
-        )
+        self.kernel.add_service(get_shared_chat_service())
         
         # Initialize tools
-        self.search_tool = SearchTool()
-        self.email_tool = EmailTool()
-        self.data_tool = DataAnalysisTool()
+        self.search_tool, self.email_tool, self.data_tool = get_shared_tools()
+        
+        # WHY: I/O-bound tools run here so one turn's tool calls overlap
+        self.tool_executor = get_shared_tool_executor()
         
         # Register tools as plugins
         self._register_tools()
@@ -82,8 +152,8 @@ class BaseAgent:
             name="search_web",
             description="Search the web for current information"
         )
-        def search_web(query: str, max_results: int = 5) -> str:
-            result = self.search_tool.search(query, max_results)
+        async def search_web(query: str, max_results: int = 5) -> str:
+            result = await self.tool_executor.run(self.search_tool.search, query, max_results)
             if result["success"]:
                 # Format for LLM consumption
                 answer = result.get("answer", "")
@@ -100,14 +170,16 @@ class BaseAgent:
             name="send_email",
             description="Send an email to a recipient"
         )
-        def send_email(to_email: str, subject: str, body: str) -> str:
-            result = self.email_tool.send_email(to_email, subject, body)
+        async def send_email(to_email: str, subject: str, body: str) -> str:
+            result = await self.tool_executor.run(self.email_tool.send_email, to_email, subject, body)
             if result["success"]:
                 return result["message"]
             else:
                 return f"Email failed: {result['error']}"
         
         # Data analysis tool
+        # WHY: Stays on the event loop - CPU-bound under the GIL, so a
+        #      worker thread would not make it faster
         @self.kernel.function(
             name="analyze_data",
             description="Analyze CSV data and generate insights"
@@ -135,6 +207,24 @@ class BaseAgent:
         if history:
             logger.info(f"Loaded {len(history)} messages from history")
     
+    def _add_user_message(self, task: str):
+        """Save the task and append it to the (bounded) chat history"""
+        
+        self.memory.save_message(self.session_id, "user", task)
+        self.chat_history.add_user_message(task)
+        
+        removed = trim_chat_messages(self.chat_history.messages, settings.chat_history_max_messages)
+        if removed:
+            logger.info(f"Trimmed {removed} old messages from chat history")
+    
+    @staticmethod
+    def _execution_settings() -> Dict:
+        """Chat completion settings for a task"""
+        # WHY: FunctionCallBehavior.AutoInvokeKernelFunctions enables automatic tool calling
+        return {
+            "function_call_behavior": FunctionCallBehavior.AutoInvokeKernelFunctions()
+        }
+    
     async def process_task(self, task: str) -> Dict:
         """
         Process a user task using agent with tools
@@ -149,20 +239,18 @@ class BaseAgent:
         logger.info(f"Processing task: {task}")
         
         # Save user message
-        self.memory.save_message(self.session_id, "user", task)
-        self.chat_history.add_user_message(task)
+        self._add_user_message(task)
         
         try:
-            # WHY: FunctionCallBehavior.AutoInvokeKernelFunctions enables automatic tool calling
-            execution_settings = {
-                "function_call_behavior": FunctionCallBehavior.AutoInvokeKernelFunctions()
-            }
+            execution_settings = self._execution_settings()
             
             # Get chat completion service
             chat_service = self.kernel.get_service(type=ChatCompletionClientBase)
             
             # WHY: get_chat_message_content handles multi-turn conversation with tool calls
-            response = await chat_service.get_chat_message_content(
+            #      Sent through the shared batcher alongside other sessions' requests
+            response = await chat_batcher.get_chat_message_content(
+                chat_service,
                 chat_history=self.chat_history,
                 settings=execution_settings,
                 kernel=self.kernel
@@ -202,6 +290,70 @@ class BaseAgent:
                 "response": error_msg,
                 "error": str(e)
             }
+        
+        finally:
+            # WHY: This turn's messages are in Cosmos DB before the caller
+            #      gets a response; off the event loop since the client blocks
+            await asyncio.to_thread(self.memory.flush, self.session_id)
+    
+    async def stream_task(self, task: str) -> AsyncIterator[str]:
+        """
+        Process a user task, yielding the answer as Server-Sent Events
+        
+        WHY: The first tokens reach the client as soon as they are
+             generated, instead of after the whole answer
+        
+        Args:
+            task: User task/question
+            
+        Yields:
+            SSE frames - "data: <JSON string>" per chunk, then a "done"
+            event, or an "error" event if the task fails
+        """
+        
+        logger.info(f"Streaming task: {task}")
+        
+        # Save user message
+        self._add_user_message(task)
+        
+        chunks: List[str] = []
+        try:
+            chat_service = self.kernel.get_service(type=ChatCompletionClientBase)
+            
+            # WHY: Through the shared batcher so streams count against the
+            #      same LLM_MAX_INFLIGHT_REQUESTS cap as process_task; aclosing
+            #      frees the slot as soon as this stream is closed early
+            stream = chat_batcher.get_streaming_chat_message_content(
+                chat_service,
+                chat_history=self.chat_history,
+                settings=self._execution_settings(),
+                kernel=self.kernel
+            )
+            async with aclosing(stream):
+                async for chunk in stream:
+                    text = str(chunk) if chunk is not None else ""
+                    if text:
+                        chunks.append(text)
+                        # WHY: JSON-encoded so newlines in a chunk don't end the SSE frame
+                        yield f"data: {json.dumps(text)}\n\n"
+            
+            # WHY: History gets the answer only once the stream has completed
+            answer = "".join(chunks)
+            self.memory.save_message(self.session_id, "assistant", answer)
+            self.chat_history.add_assistant_message(answer)
+            
+            logger.info("Streamed task completed")
+            yield f"event: done\ndata: {json.dumps({'session_id': self.session_id})}\n\n"
+            
+        except Exception as e:
+            logger.error(f"Task streaming failed: {e}")
+            error_msg = f"I encountered an error: {str(e)}"
+            self.memory.save_message(self.session_id, "assistant", error_msg)
+            
+            yield f"event: error\ndata: {json.dumps(error_msg)}\n\n"
+        
+        finally:
+            await asyncio.to_thread(self.memory.flush, self.session_id)
     
     def clear_history(self):
         """Clear conversation history"""
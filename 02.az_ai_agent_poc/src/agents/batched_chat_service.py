@@ -0,0 +1,180 @@
+"""
+Batched Chat Completion Service
+Purpose: Coalesce concurrent chat completion requests into parallel bursts
+"""
+
+from typing import Any, AsyncIterator, List, Optional, Set, Tuple
+import asyncio
+
+from config.config import settings
+from config.logger import app_logger as logger
+
+
+class BatchedChatService:
+    """
+    Request-coalescing queue in front of chat completion services
+
+    WHY: Concurrent sessions each await their own completion call.
+         Queueing them for a few milliseconds and sending them together
+         keeps the endpoint busy with one burst of requests instead of a
+         trickle. Each caller is resolved as soon as its own call returns,
+         and at most max_inflight calls are outstanding at once.
+         The window defaults to 20 ms (llm_max_wait_ms); with 0, calls
+         skip the queue and only take an inflight slot
+    """
+
+    def __init__(
+        self,
+        max_batch: Optional[int] = None,
+        max_wait_ms: Optional[int] = None,
+        max_inflight: Optional[int] = None
+    ):
+        """
+        Initialize batching queue
+
+        Args:
+            max_batch: Max requests dispatched together (default: settings.llm_max_batch)
+            max_wait_ms: Max wait for a batch to fill (default: settings.llm_max_wait_ms)
+            max_inflight: Max calls outstanding at once (default: settings.llm_max_inflight_requests)
+        """
+
+        self.max_batch = max_batch or settings.llm_max_batch
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else settings.llm_max_wait_ms) / 1000
+        self.max_inflight = max_inflight or settings.llm_max_inflight_requests
+
+        # WHY: Created lazily - a queue, semaphore and tasks belong to one event loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._inflight: Optional[asyncio.Semaphore] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        # WHY: The loop only keeps weak references to tasks - hold dispatches
+        #      here so one can't be garbage-collected mid-flight
+        self._dispatches: Set[asyncio.Task] = set()
+
+    async def get_chat_message_content(self, service: Any, **kwargs) -> Any:
+        """
+        Queue one get_chat_message_content call and wait for its response
+
+        Args:
+            service: Chat completion service to call
+            **kwargs: Arguments for service.get_chat_message_content
+
+        Returns:
+            The service's response (exceptions are re-raised here)
+        """
+
+        self._ensure_loop()
+
+        if self.max_wait <= 0:
+            # WHY: No window to coalesce in - a queue and worker hop would
+            #      only add latency. Cancelling the caller cancels the call
+            async with self._inflight:
+                return await service.get_chat_message_content(**kwargs)
+
+        self._ensure_worker()
+
+        future = self._loop.create_future()
+        await self._queue.put((service, kwargs, future))
+        return await future
+
+    async def get_streaming_chat_message_content(self, service: Any, **kwargs) -> AsyncIterator[Any]:
+        """
+        Stream one get_streaming_chat_message_content call under the inflight cap
+
+        WHY: A stream holds its connection until the last chunk, so it takes
+             an inflight slot for the whole stream. Streams are not queued -
+             each caller consumes its own chunks as they arrive
+
+        Args:
+            service: Chat completion service to call
+            **kwargs: Arguments for service.get_streaming_chat_message_content
+
+        Yields:
+            The service's streamed chunks
+        """
+
+        self._ensure_loop()
+
+        async with self._inflight:
+            async for chunk in service.get_streaming_chat_message_content(**kwargs):
+                yield chunk
+
+    def _ensure_loop(self):
+        """Bind the inflight semaphore to the running event loop"""
+
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+
+        self._loop = loop
+        self._queue = None
+        self._worker = None
+        self._inflight = asyncio.Semaphore(self.max_inflight)
+
+    def _ensure_worker(self):
+        """Start the batching task on the bound event loop"""
+
+        if self._worker and not self._worker.done():
+            return
+
+        self._queue = asyncio.Queue()
+        self._worker = self._loop.create_task(self._run())
+
+    async def _run(self):
+        """Collect requests into batches and dispatch them"""
+
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # WHY: Dispatched as its own task so the next batch can fill
+            #      while this one is in flight
+            task = self._loop.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch: List[Tuple[Any, dict, asyncio.Future]]):
+        """Send a batch concurrently"""
+
+        logger.debug(f"Dispatching {len(batch)} chat completion requests")
+        await asyncio.gather(*[self._call(service, kwargs, future) for service, kwargs, future in batch])
+
+    async def _call(self, service: Any, kwargs: dict, future: asyncio.Future):
+        """Make one call and resolve its caller's future as soon as it returns"""
+
+        # WHY: Slots are per call, not per batch - a fast answer never waits
+        #      for a slow, multi-tool turn that happened to share its batch
+        async with self._inflight:
+            if future.done():
+                return  # WHY: Caller was cancelled while queued
+
+            call = asyncio.ensure_future(service.get_chat_message_content(**kwargs))
+            # WHY: A cancelled caller (client disconnect, timeout) cancels its
+            #      upstream call, so it stops spending tokens and frees the slot
+            future.add_done_callback(lambda f: call.cancel() if f.cancelled() else None)
+
+            try:
+                response = await call
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    return  # WHY: Cancelled on the caller's behalf - nothing to resolve
+                call.cancel()
+                future.cancel()
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                return
+
+        if not future.done():  # WHY: Caller may have been cancelled while waiting
+            future.set_result(response)
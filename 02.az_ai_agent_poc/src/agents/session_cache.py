@@ -0,0 +1,93 @@
+"""
+Agent Session Cache
+Purpose: Bounded, expiring in-process cache of agents per session
+"""
+
+from typing import Callable, Generic, Optional, TypeVar
+from collections import OrderedDict
+import time
+
+T = TypeVar("T")
+
+
+class SessionCache(Generic[T]):
+    """
+    LRU cache with an idle timeout
+    
+    WHY: Every session holds a kernel, tools and chat history; a plain
+         dict keeps them until the process dies. Evicted sessions are
+         cheap to bring back - the agent reloads recent history from
+         Cosmos DB - so the cache bounds memory, not correctness
+    """
+    
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        on_evict: Optional[Callable[[T], None]] = None
+    ):
+        """
+        Initialize cache
+        
+        Args:
+            maxsize: Max cached sessions; least recently used are evicted first
+            ttl: Seconds a session may sit idle before it is evicted
+            on_evict: Called with each evicted value (e.g. to release resources)
+        """
+        
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self._items: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+    
+    def get(self, key: str) -> Optional[T]:
+        """Value for key, refreshing its idle timeout, or None"""
+        
+        self._expire()
+        entry = self._items.get(key)
+        if entry is None:
+            return None
+        
+        self._items[key] = (time.monotonic() + self.ttl, entry[1])
+        self._items.move_to_end(key)
+        return entry[1]
+    
+    def put(self, key: str, value: T):
+        """Insert or replace a value, evicting the least recently used if full"""
+        
+        self._items[key] = (time.monotonic() + self.ttl, value)
+        self._items.move_to_end(key)
+        
+        while len(self._items) > self.maxsize:
+            _, (_, evicted) = self._items.popitem(last=False)
+            self._evicted(evicted)
+    
+    def pop(self, key: str) -> Optional[T]:
+        """Remove and return a value without calling on_evict"""
+        
+        entry = self._items.pop(key, None)
+        return entry[1] if entry else None
+    
+    def _expire(self):
+        """Evict entries idle for longer than ttl"""
+        
+        now = time.monotonic()
+        # WHY: Ordered by last use, so expired entries are at the front
+        while self._items:
+            key, (expires_at, value) = next(iter(self._items.items()))
+            if expires_at > now:
+                break
+            del self._items[key]
+            self._evicted(value)
+    
+    def _evicted(self, value: T):
+        """Run the eviction callback"""
+        if self.on_evict:
+            self.on_evict(value)
+    
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+    
+    def __len__(self) -> int:
+        self._expire()
+        return len(self._items)
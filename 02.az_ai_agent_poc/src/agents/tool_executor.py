@@ -0,0 +1,51 @@
+"""
+Parallel Tool Executor
+Purpose: Run blocking tool calls off the event loop, several at once
+"""
+
+from typing import Any, Callable, Optional
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import functools
+
+from config.config import settings
+
+
+class ParallelToolExecutor:
+    """
+    Bounded thread pool for I/O-bound tool calls
+    
+    WHY: The tool clients (Tavily, SendGrid) block on HTTP. Called directly
+         from a kernel function they stall the event loop, so tool calls
+         from one assistant turn - and other sessions' requests - wait
+         for each other. In worker threads their latencies overlap
+    """
+    
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Initialize thread pool
+        
+        Args:
+            max_workers: Max concurrent tool calls (default: settings.tool_concurrency_limit)
+        """
+        
+        # WHY: Threads start on first use, so idle agents hold none
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers or settings.tool_concurrency_limit,
+            thread_name_prefix="tool"
+        )
+    
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run a thread-safe blocking function in the pool
+        
+        Returns:
+            The function's return value
+        """
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, functools.partial(fn, *args, **kwargs))
+    
+    def shutdown(self):
+        """Stop accepting calls; running ones finish in the background"""
+        self._pool.shutdown(wait=False)
@@ -4,13 +4,18 @@ Purpose: REST API endpoints for agent interaction
 """
 
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional, List, Dict
+from functools import lru_cache
 import asyncio
 import uuid
 
 from src.agents.base_agent import BaseAgent
+from src.agents.session_cache import SessionCache
+from src.memory.conversation_memory import ConversationMemory
+from config.config import settings
 from config.logger import app_logger as logger
 
 # Initialize FastAPI app
@@ -29,8 +34,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# In-memory agent sessions (in production, use Cosmos DB)
-active_agents: Dict[str, BaseAgent] = {}
+# In-memory agent sessions, bounded and expiring
+# WHY: Per process - a session missing here (evicted, or served by another
+#      worker) is rebuilt with its recent history from Cosmos DB
+# WHY: No on_evict cleanup - agents share the chat service, tools and tool
+#      pool, and an evicted agent may still be serving a request
+active_agents: SessionCache[BaseAgent] = SessionCache(
+    maxsize=settings.agent_cache_max_sessions,
+    ttl=settings.agent_cache_ttl_seconds
+)
+
+# WHY: Agents being built, so concurrent first requests of a session share one
+_pending_agents: Dict[str, asyncio.Future] = {}
 
 
 # Request/Response models
@@ -60,6 +75,46 @@ class SessionResponse(BaseModel):
     message: str
 
 
+async def get_or_create_agent(session_id: str) -> BaseAgent:
+    """Return the session's agent, creating it on first use"""
+    
+    # WHY: No await between lookup and registration, so no lock is needed -
+    #      nothing else runs on the event loop in between
+    agent = active_agents.get(session_id)
+    if agent is not None:
+        return agent
+    
+    pending = _pending_agents.get(session_id)
+    if pending is None:
+        # WHY: Construction blocks on Cosmos DB (setup + history load) - keep it off the event loop
+        pending = asyncio.ensure_future(asyncio.to_thread(BaseAgent, session_id=session_id))
+        _pending_agents[session_id] = pending
+        pending.add_done_callback(lambda future: _agent_built(session_id, future))
+    
+    # WHY: A disconnecting client must not cancel a build other requests wait on
+    return await asyncio.shield(pending)
+
+
+@lru_cache(maxsize=1)
+def get_session_memory() -> ConversationMemory:
+    """
+    Conversation store for session endpoints that need no agent
+    
+    WHY: History and delete only touch Cosmos DB - building an agent (kernel,
+         plugins, history load) for an uncached id would be wasted work, and
+         caching it would push live sessions out of the LRU
+    """
+    return ConversationMemory()
+
+
+def _agent_built(session_id: str, future: asyncio.Future):
+    """Move a finished agent build into the session cache"""
+    
+    del _pending_agents[session_id]
+    if not future.cancelled() and future.exception() is None:
+        active_agents.put(session_id, future.result())
+
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
@@ -79,8 +134,7 @@ async def create_session():
     """
     
     session_id = str(uuid.uuid4())
-    agent = BaseAgent(session_id=session_id)
-    active_agents[session_id] = agent
+    await get_or_create_agent(session_id)
     
     logger.info(f"Created session: {session_id}")
     
@@ -103,16 +157,8 @@ async def process_task(request: TaskRequest):
     """
     
     # Get or create session
-    session_id = request.session_id
-    if not session_id:
-        session_id = str(uuid.uuid4())
-    
-    # Get or create agent
-    if session_id not in active_agents:
-        agent = BaseAgent(session_id=session_id)
-        active_agents[session_id] = agent
-    else:
-        agent = active_agents[session_id]
+    session_id = request.session_id or str(uuid.uuid4())
+    agent = await get_or_create_agent(session_id)
     
     # Process task
     try:
@@ -131,30 +177,61 @@ async def process_task(request: TaskRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/agent/task/stream")
+async def stream_task(request: TaskRequest):
+    """
+    Process a task with the agent, streaming the answer
+    
+    WHY: Server-Sent Events deliver tokens as they are generated, so time
+         to first byte is the model's first token, not the full answer
+    
+    Args:
+        request: Task request with optional session_id
+        
+    Returns:
+        text/event-stream of answer chunks (session id in X-Session-Id)
+    """
+    
+    session_id = request.session_id or str(uuid.uuid4())
+    agent = await get_or_create_agent(session_id)
+    
+    return StreamingResponse(
+        agent.stream_task(request.task),
+        media_type="text/event-stream",
+        headers={"X-Session-Id": session_id}
+    )
+
+
 @app.delete("/session/{session_id}")
 async def delete_session(session_id: str):
     """Delete an agent session"""
     
-    if session_id in active_agents:
-        agent = active_agents[session_id]
-        agent.clear_history()
-        del active_agents[session_id]
-        
-        logger.info(f"Deleted session: {session_id}")
-        return {"message": f"Session {session_id} deleted"}
-    else:
+    agent = active_agents.pop(session_id)
+    memory = agent.memory if agent is not None else get_session_memory()
+    
+    # WHY: An evicted session still has messages in Cosmos DB; an id with
+    #      neither a cached agent nor messages was never a session
+    if agent is None and not await asyncio.to_thread(memory.has_messages, session_id):
         raise HTTPException(status_code=404, detail="Session not found")
+    
+    await asyncio.to_thread(memory.clear_session, session_id)
+    
+    logger.info(f"Deleted session: {session_id}")
+    return {"message": f"Session {session_id} deleted"}
 
 
 @app.get("/session/{session_id}/history")
 async def get_session_history(session_id: str):
     """Get conversation history for a session"""
     
-    if session_id not in active_agents:
-        raise HTTPException(status_code=404, detail="Session not found")
+    agent = active_agents.get(session_id)
+    memory = agent.memory if agent is not None else get_session_memory()
+    history = await asyncio.to_thread(memory.get_conversation_history, session_id)
     
-    agent = active_agents[session_id]
-    history = agent.memory.get_conversation_history(session_id)
+    # WHY: A cached agent is a live (possibly still empty) session; otherwise
+    #      no stored messages means no such session
+    if agent is None and not history:
+        raise HTTPException(status_code=404, detail="Session not found")
     
     return {
         "session_id": session_id,
@@ -5,11 +5,20 @@ Purpose: Persistent conversation history storage and retrieval
 
 from typing import List, Dict, Optional
 from datetime import datetime
+import asyncio
+import json
+import threading
 from azure.cosmos import CosmosClient, PartitionKey
-from azure.cosmos.exceptions import CosmosResourceNotFoundError
+from azure.cosmos.exceptions import CosmosHttpResponseError, CosmosResourceNotFoundError
 from config.config import settings
 from config.logger import app_logger as logger
 
+# WHY: Cosmos DB transactional batches hold at most 100 operations
+COSMOS_BATCH_LIMIT = 100
+
+# WHY: ...and a 2 MB payload; the rest is left for the batch envelope
+COSMOS_BATCH_MAX_BYTES = 1_800_000
+
 
 class ConversationMemory:
     """
@@ -48,6 +57,12 @@ class ConversationMemory:
             
             logger.info(f"✓ Connected to Cosmos DB: {settings.cosmos_database}/{settings.cosmos_container}")
             
+            # WHY: Write-behind buffer - messages per session_id waiting for flush()
+            self._pending: Dict[str, List[Dict]] = {}
+            # WHY: Failed flushes per queued message id, capped by memory_flush_max_attempts
+            self._attempts: Dict[str, int] = {}
+            self._pending_lock = threading.Lock()
+            
         except Exception as e:
             logger.error(f"Failed to initialize Cosmos DB: {e}")
             raise
@@ -60,7 +75,12 @@ class ConversationMemory:
         metadata: Optional[Dict] = None
     ) -> Dict:
         """
-        Save a conversation message to Cosmos DB
+        Queue a conversation message for Cosmos DB
+        
+        WHY: One upsert per message costs a round-trip and a request charge
+             each. Messages are buffered per session and written together
+             by flush() as a transactional batch - after memory_flush_ms,
+             or when the caller flushes explicitly
         
         Args:
             session_id: Unique session identifier
@@ -69,7 +89,7 @@ class ConversationMemory:
             metadata: Optional metadata (tool calls, costs, etc.)
             
         Returns:
-            Created message document
+            Message document (written on the next flush)
         """
         
         message = {
@@ -81,15 +101,124 @@ class ConversationMemory:
             "metadata": metadata or {}
         }
         
+        with self._pending_lock:
+            pending = self._pending.setdefault(session_id, [])
+            pending.append(message)
+            first_pending = len(pending) == 1
+            full = len(pending) >= COSMOS_BATCH_LIMIT
+        
+        logger.debug(f"Message queued: {role} in session {session_id}")
+        
+        if full:
+            self.flush(session_id)
+        elif first_pending:
+            self._schedule_flush(session_id)
+        
+        return message
+    
+    def _schedule_flush(self, session_id: str):
+        """Flush a session after memory_flush_ms when an event loop is running"""
+        
         try:
-            # WHY: upsert_item creates or replaces document atomically
-            created_message = self.container.upsert_item(message)
-            logger.debug(f"Message saved: {role} in session {session_id}")
-            return created_message
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # WHY: No loop (scripts, sync callers) - flushed explicitly or on read
+        
+        # WHY: flush() blocks on Cosmos DB, so it runs in the default executor
+        loop.call_later(
+            settings.memory_flush_ms / 1000,
+            lambda: loop.run_in_executor(None, self.flush, session_id)
+        )
+    
+    def flush(self, session_id: str) -> int:
+        """
+        Write a session's queued messages to Cosmos DB
+        
+        WHY: execute_item_batch writes up to 100 upserts for one partition
+             key in a single request. A failed batch is re-queued and retried
+             by later flushes, up to memory_flush_max_attempts times
+        
+        Args:
+            session_id: Unique session identifier
             
-        except Exception as e:
-            logger.error(f"Failed to save message: {e}")
-            raise
+        Returns:
+            Number of messages written
+        """
+        
+        with self._pending_lock:
+            messages = self._pending.pop(session_id, [])
+        
+        written = 0
+        failed: List[Dict] = []
+        for batch in self._batches(messages):
+            try:
+                self.container.execute_item_batch(
+                    batch_operations=[("upsert", (message,)) for message in batch],
+                    partition_key=session_id
+                )
+            except Exception as e:
+                logger.error(f"Failed to save {len(batch)} messages in session {session_id}: {e}")
+                failed.extend(batch)
+                continue
+            
+            written += len(batch)
+            with self._pending_lock:
+                for message in batch:
+                    self._attempts.pop(message["id"], None)
+        
+        if failed:
+            self._requeue(session_id, failed)
+        
+        if written:
+            logger.debug(f"Flushed {written} messages in session {session_id}")
+        return written
+    
+    @staticmethod
+    def _batches(messages: List[Dict]) -> List[List[Dict]]:
+        """Split messages into batches within Cosmos DB's operation and payload limits"""
+        
+        batches: List[List[Dict]] = []
+        batch: List[Dict] = []
+        batch_bytes = 0
+        
+        for message in messages:
+            size = len(json.dumps(message, default=str).encode("utf-8"))
+            if batch and (len(batch) >= COSMOS_BATCH_LIMIT or batch_bytes + size > COSMOS_BATCH_MAX_BYTES):
+                batches.append(batch)
+                batch, batch_bytes = [], 0
+            batch.append(message)
+            batch_bytes += size
+        
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    def _requeue(self, session_id: str, messages: List[Dict]):
+        """Put failed messages back in front of the queue, dropping those out of attempts"""
+        
+        retry: List[Dict] = []
+        dropped = 0
+        with self._pending_lock:
+            for message in messages:
+                attempts = self._attempts.get(message["id"], 0) + 1
+                if attempts >= settings.memory_flush_max_attempts:
+                    # WHY: A message that keeps failing (e.g. larger than a
+                    #      Cosmos item may be) would otherwise block the
+                    #      session's writes and grow the queue forever
+                    self._attempts.pop(message["id"], None)
+                    dropped += 1
+                else:
+                    self._attempts[message["id"]] = attempts
+                    retry.append(message)
+            
+            if retry:
+                self._pending[session_id] = retry + self._pending.get(session_id, [])
+        
+        if dropped:
+            logger.error(
+                f"Dropped {dropped} messages in session {session_id} after "
+                f"{settings.memory_flush_max_attempts} failed writes"
+            )
     
     def get_conversation_history(
         self,
@@ -107,25 +236,41 @@ class ConversationMemory:
             List of messages ordered by timestamp
         """
         
+        # WHY: Read-your-writes - queued messages are part of the history
+        self.flush(session_id)
+        
         try:
             # WHY: Query by partition key (session_id) is most efficient
-            query = f"""
-                SELECT * FROM c 
-                WHERE c.session_id = @session_id 
-                ORDER BY c.timestamp ASC
-            """
-            
+            #      Only the fields callers read are returned, not Cosmos system properties
+            fields = "c.id, c.role, c.content, c.timestamp, c.metadata"
             parameters = [{"name": "@session_id", "value": session_id}]
             
+            if limit:
+                # WHY: Newest `limit` messages selected server-side, so long
+                #      sessions don't send their whole history to be sliced here
+                query = f"""
+                    SELECT {fields} FROM c 
+                    WHERE c.session_id = @session_id 
+                    ORDER BY c.timestamp DESC 
+                    OFFSET 0 LIMIT @limit
+                """
+                parameters.append({"name": "@limit", "value": int(limit)})
+            else:
+                query = f"""
+                    SELECT {fields} FROM c 
+                    WHERE c.session_id = @session_id 
+                    ORDER BY c.timestamp ASC
+                """
+            
             messages = list(self.container.query_items(
                 query=query,
                 parameters=parameters,
-                enable_cross_partition_query=False  # WHY: Single partition query is faster
+                enable_cross_partition_query=False,  # WHY: Single partition query is faster
+                max_item_count=limit or None  # WHY: One page holds the whole result
             ))
             
-            # Apply limit if specified
             if limit:
-                messages = messages[-limit:]  # WHY: Get most recent messages
+                messages.reverse()  # WHY: Back to oldest-first order
             
             logger.debug(f"Retrieved {len(messages)} messages for session {session_id}")
             return messages
@@ -163,34 +308,82 @@ class ConversationMemory:
             logger.error(f"Failed to get session state: {e}")
             return None
     
-    def clear_session(self, session_id: str) -> int:
+    def has_messages(self, session_id: str) -> bool:
         """
-        Delete all messages in a session
+        Check whether a session has any messages
+        
+        WHY: A one-id projection on the session's partition - cheaper than
+             loading the whole history just to test that the session exists
         
         Args:
             session_id: Unique session identifier
             
         Returns:
-            Number of messages deleted
+            True if the session has stored or queued messages
         """
         
+        with self._pending_lock:
+            if self._pending.get(session_id):
+                return True
+        
         try:
-            messages = self.get_conversation_history(session_id)
+            items = self.container.query_items(
+                query="SELECT TOP 1 c.id FROM c WHERE c.session_id = @session_id",
+                parameters=[{"name": "@session_id", "value": session_id}],
+                enable_cross_partition_query=False,
+                max_item_count=1
+            )
+            return next(iter(items), None) is not None
             
-            deleted_count = 0
-            for message in messages:
-                self.container.delete_item(
-                    item=message["id"],
-                    partition_key=session_id
-                )
-                deleted_count += 1
+        except Exception as e:
+            logger.error(f"Failed to check session: {e}")
+            return False
+    
+    def clear_session(self, session_id: str) -> bool:
+        """
+        Delete all messages in a session
+        
+        WHY: session_id is the partition key, so one server-side
+             delete-by-partition request removes the whole conversation
+             instead of a query plus one delete per message
+        
+        Args:
+            session_id: Unique session identifier
             
-            logger.info(f"Cleared {deleted_count} messages from session {session_id}")
-            return deleted_count
+        Returns:
+            True if the session was cleared
+        """
+        
+        with self._pending_lock:
+            for message in self._pending.pop(session_id, []):
+                self._attempts.pop(message["id"], None)
+        
+        try:
+            try:
+                self.container.delete_all_items_by_partition_key(partition_key=session_id)
+            except CosmosHttpResponseError as e:
+                # WHY: Delete by partition key must be enabled on the account;
+                #      fall back to deleting message by message
+                logger.warning(f"Partition delete unavailable, deleting per message: {e}")
+                self._delete_session_items(session_id)
+            
+            logger.info(f"Cleared session {session_id}")
+            return True
             
         except Exception as e:
             logger.error(f"Failed to clear session: {e}")
-            return 0
+            return False
+    
+    def _delete_session_items(self, session_id: str):
+        """Delete a session's messages one by one"""
+        
+        ids = self.container.query_items(
+            query="SELECT c.id FROM c WHERE c.session_id = @session_id",
+            parameters=[{"name": "@session_id", "value": session_id}],
+            enable_cross_partition_query=False
+        )
+        for item in ids:
+            self.container.delete_item(item=item["id"], partition_key=session_id)
     
     def delete_old_sessions(self, days_old: int = 30) -> int:
         """
@@ -222,11 +415,10 @@ class ConversationMemory:
                 enable_cross_partition_query=True
             ))
             
-            deleted_count = 0
             for session in old_sessions:
                 self.clear_session(session["session_id"])
-                deleted_count += 1
             
+            deleted_count = len(old_sessions)
             logger.info(f"Deleted {deleted_count} sessions older than {days_old} days")
             return deleted_count
             
@@ -268,7 +460,7 @@ if __name__ == "__main__":
     
     # Clean up
     print(f"\nCleaning up test session...")
-    deleted = memory.clear_session(session_id)
-    print(f"✓ Deleted {deleted} messages")
+    if memory.clear_session(session_id):
+        print("✓ Session deleted")
     
     print("\n✅ Memory test complete!")
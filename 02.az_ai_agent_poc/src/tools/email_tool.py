@@ -20,6 +20,9 @@ class EmailTool:
          - Free tier (100 emails/day)
          - Simple API
          - Delivery tracking
+    
+    WHY: send_email() is thread-safe - it keeps no state between calls,
+         so the agent runs it in worker threads
     """
     
     def __init__(self):
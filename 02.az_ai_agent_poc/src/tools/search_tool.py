@@ -8,6 +8,7 @@ import os
 from tavily import TavilyClient
 from config.config import settings
 from config.logger import app_logger as logger
+from src.tools.ttl_cache import ttl_lru_cache
 
 
 class SearchTool:
@@ -19,6 +20,9 @@ class SearchTool:
          - Real-time information
          - Free tier (1000 searches/month)
          - Snippet extraction
+    
+    WHY: search() is thread-safe - it keeps no state between calls, so
+         the agent runs several searches at once in worker threads
     """
     
     def __init__(self):
@@ -31,6 +35,7 @@ class SearchTool:
             self.client = TavilyClient(api_key=settings.tavily_api_key)
             logger.info("SearchTool initialized")
     
+    @ttl_lru_cache(maxsize=256, ttl=300)
     def search(self, query: str, max_results: int = 5) -> Dict:
         """
         Search the web for information
@@ -0,0 +1,75 @@
+"""
+TTL Cache for Tool Results
+Purpose: Reuse results of identical tool calls for a limited time
+"""
+
+from typing import Callable, Dict, Optional
+from collections import OrderedDict
+import copy
+import functools
+import inspect
+import threading
+import time
+
+
+def ttl_lru_cache(maxsize: int = 256, ttl: float = 300, key: Optional[Callable[..., object]] = None):
+    """
+    Memoize a tool method returning a result dict, bounded by size and age
+    
+    WHY: The LLM retries steps and sessions repeat questions; an identical
+         call should not pay for another web search or CSV parse. The
+         cache is per method, so it is shared by every tool instance
+         (and session). Results with success=False are never cached.
+         Every caller gets its own deep copy, so mutating a result can't
+         change what later sessions are served
+    
+    Args:
+        maxsize: Max cached results; least recently used are evicted first
+        ttl: Seconds a result stays valid
+        key: Builds the cache key from the call's arguments (without self);
+             defaults to the tuple of all arguments
+    
+    Returns:
+        Decorator for methods whose arguments are hashable (or covered by key)
+    """
+    
+    def decorator(method: Callable[..., Dict]) -> Callable[..., Dict]:
+        signature = inspect.signature(method)
+        cache: "OrderedDict[object, tuple]" = OrderedDict()
+        lock = threading.Lock()  # WHY: Tools run in worker threads
+        
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs) -> Dict:
+            # WHY: Bind with defaults so search("q") and search("q", 5) share an entry
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            arguments.pop("self")
+            cache_key = key(**arguments) if key else tuple(arguments.items())
+            
+            now = time.monotonic()
+            with lock:
+                entry = cache.get(cache_key)
+                fresh = entry is not None and entry[0] > now
+                if fresh:
+                    cache.move_to_end(cache_key)
+            
+            if fresh:
+                # WHY: Copied outside the lock - entries are never mutated in place
+                return copy.deepcopy(entry[1])
+            
+            result = method(self, *args, **kwargs)
+            
+            if result.get("success") is not False:
+                with lock:
+                    cache[cache_key] = (now + ttl, copy.deepcopy(result))
+                    cache.move_to_end(cache_key)
+                    if len(cache) > maxsize:
+                        cache.popitem(last=False)
+            
+            return result
+        
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    
+    return decorator
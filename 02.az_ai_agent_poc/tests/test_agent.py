@@ -78,6 +78,34 @@ def test_data_tool_statistics():
     assert result["count"] == 5
 
 
+def test_data_tool_caches_csv_analysis():
+    """Test identical analyses are served from cache, failures are not cached"""
+    import pandas as pd
+    from src.tools.data_tool import DataAnalysisTool
+    
+    DataAnalysisTool.analyze_csv.cache_clear()
+    csv_data = "a,b\n1,2\n3,4"
+    
+    with patch('src.tools.data_tool.pd.read_csv', wraps=pd.read_csv) as mock_read:
+        first = DataAnalysisTool().analyze_csv(csv_data)
+        second = DataAnalysisTool().analyze_csv(csv_data, "summary")
+        
+        assert second == first
+        assert mock_read.call_count == 1
+        
+        # WHY: A caller mutating its result doesn't change what others are served
+        second["columns"] = -1
+        assert DataAnalysisTool().analyze_csv(csv_data)["columns"] == first["columns"]
+        
+        DataAnalysisTool().analyze_csv(csv_data, "head")
+        assert mock_read.call_count == 2
+    
+    with patch('src.tools.data_tool.pd.read_csv', side_effect=ValueError("bad csv")) as mock_read:
+        DataAnalysisTool().analyze_csv("x,y\n1,2")
+        DataAnalysisTool().analyze_csv("x,y\n1,2")
+        assert mock_read.call_count == 2
+
+
 # ============================================
 # MEMORY TESTS
 # ============================================
@@ -92,12 +120,62 @@ async def test_conversation_memory_save_message():
         
         # Mock container
         memory.container = Mock()
-        memory.container.upsert_item = Mock(return_value={"id": "test-msg-1"})
         
         result = memory.save_message("session-1", "user", "Hello")
+        memory.save_message("session-1", "assistant", "Hi there")
         
-        assert memory.container.upsert_item.called
-        assert result["id"] == "test-msg-1"
+        assert result["session_id"] == "session-1"
+        assert result["content"] == "Hello"
+        assert not memory.container.execute_item_batch.called
+        
+        # WHY: Both messages go out in one transactional batch
+        assert memory.flush("session-1") == 2
+        memory.container.execute_item_batch.assert_called_once()
+        kwargs = memory.container.execute_item_batch.call_args.kwargs
+        assert kwargs["partition_key"] == "session-1"
+        assert [op for op, _ in kwargs["batch_operations"]] == ["upsert", "upsert"]
+        assert memory.flush("session-1") == 0
+
+
+def test_conversation_memory_flush_splits_large_batches():
+    """Test batches stay under Cosmos DB's payload limit, not just its operation count"""
+    from src.memory.conversation_memory import ConversationMemory, COSMOS_BATCH_MAX_BYTES
+
+    with patch('src.memory.conversation_memory.CosmosClient'):
+        memory = ConversationMemory()
+        memory.container = Mock()
+
+        for i in range(3):
+            memory.save_message("s1", "user", "x" * (COSMOS_BATCH_MAX_BYTES // 2) + str(i))
+
+        assert memory.flush("s1") == 3
+        batch_sizes = [
+            len(call.kwargs["batch_operations"])
+            for call in memory.container.execute_item_batch.call_args_list
+        ]
+        assert batch_sizes == [1, 1, 1]
+
+
+def test_conversation_memory_flush_drops_after_max_attempts():
+    """Test a failing batch is retried a bounded number of times, then dropped"""
+    from src.memory.conversation_memory import ConversationMemory
+
+    with patch('src.memory.conversation_memory.CosmosClient'), \
+         patch('src.memory.conversation_memory.settings') as mock_settings:
+        mock_settings.memory_flush_max_attempts = 2
+        memory = ConversationMemory()
+        memory.container = Mock()
+        memory.container.execute_item_batch.side_effect = Exception("Request size is too large")
+
+        memory.save_message("s1", "user", "Hello")
+
+        assert memory.flush("s1") == 0
+        assert memory.has_messages("s1")  # WHY: Re-queued for the next flush
+
+        assert memory.flush("s1") == 0
+        assert memory._pending == {}
+        assert memory._attempts == {}
+        assert memory.container.execute_item_batch.call_count == 2
 
 
 @pytest.mark.asyncio
@@ -122,6 +200,66 @@ async def test_conversation_memory_get_history():
         assert history[0]["role"] == "user"
 
 
+@pytest.mark.asyncio
+async def test_conversation_memory_get_history_limit():
+    """Test history limit is applied in the query and order is oldest first"""
+    from src.memory.conversation_memory import ConversationMemory
+    
+    with patch('src.memory.conversation_memory.CosmosClient'):
+        memory = ConversationMemory()
+        
+        # WHY: The limited query returns newest first
+        mock_messages = [
+            {"id": "3", "role": "user", "content": "Third"},
+            {"id": "2", "role": "assistant", "content": "Second"}
+        ]
+        memory.container = Mock()
+        memory.container.query_items = Mock(return_value=mock_messages)
+        
+        history = memory.get_conversation_history("s1", limit=2)
+        
+        kwargs = memory.container.query_items.call_args.kwargs
+        assert "LIMIT @limit" in kwargs["query"]
+        assert {"name": "@limit", "value": 2} in kwargs["parameters"]
+        assert [m["id"] for m in history] == ["2", "3"]
+
+
+def test_conversation_memory_clear_session():
+    """Test clearing a session deletes its partition in one call"""
+    from src.memory.conversation_memory import ConversationMemory
+    
+    with patch('src.memory.conversation_memory.CosmosClient'):
+        memory = ConversationMemory()
+        memory.container = Mock()
+        
+        assert memory.clear_session("s1") is True
+        
+        memory.container.delete_all_items_by_partition_key.assert_called_once_with(partition_key="s1")
+        assert not memory.container.query_items.called
+        assert not memory.container.delete_item.called
+
+
+def test_conversation_memory_has_messages():
+    """Test session existence is a one-item query, queued messages included"""
+    from src.memory.conversation_memory import ConversationMemory
+    
+    with patch('src.memory.conversation_memory.CosmosClient'):
+        memory = ConversationMemory()
+        memory.container = Mock()
+        memory.container.query_items = Mock(return_value=iter([]))
+        
+        assert memory.has_messages("s1") is False
+        assert "TOP 1" in memory.container.query_items.call_args.kwargs["query"]
+        
+        memory.container.query_items = Mock(return_value=iter([{"id": "1"}]))
+        assert memory.has_messages("s1") is True
+        
+        memory.save_message("s2", "user", "Hello")
+        memory.container.query_items.reset_mock()
+        assert memory.has_messages("s2") is True
+        assert not memory.container.query_items.called
+
+
 # ============================================
 # AGENT TESTS
 # ============================================
@@ -158,7 +296,8 @@ async def test_agent_process_task():
         mock_settings.azure_openai_endpoint = "https://test.openai.azure.com/"
         mock_settings.azure_openai_api_key = "test-key"
         mock_settings.azure_openai_deployment = "gpt-4o-mini"
-        
+        mock_settings.chat_history_max_messages = 40
+
         # Mock kernel response
         mock_response = Mock()
         mock_response.__str__ = lambda self: "Test response"
@@ -175,6 +314,242 @@ async def test_agent_process_task():
         assert result["session_id"] == "test-session"
 
 
+@pytest.mark.asyncio
+async def test_batched_chat_service_coalesces_requests():
+    """Test concurrent requests are dispatched together and resolved in order"""
+    from src.agents.batched_chat_service import BatchedChatService
+    
+    batcher = BatchedChatService(max_batch=8, max_wait_ms=20)
+    batcher._dispatch = AsyncMock(wraps=batcher._dispatch)
+    
+    service = Mock()
+    service.get_chat_message_content = AsyncMock(
+        side_effect=lambda chat_history, **kwargs: f"reply to {chat_history}"
+    )
+    
+    responses = await asyncio.gather(*[
+        batcher.get_chat_message_content(service, chat_history=f"h{i}")
+        for i in range(3)
+    ])
+    
+    assert responses == ["reply to h0", "reply to h1", "reply to h2"]
+    assert batcher._dispatch.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_batched_chat_service_coalesces_by_default():
+    """Test the default settings queue calls into batches"""
+    from src.agents.batched_chat_service import BatchedChatService
+    
+    batcher = BatchedChatService()
+    batcher._dispatch = AsyncMock(wraps=batcher._dispatch)
+    
+    service = Mock()
+    service.get_chat_message_content = AsyncMock(side_effect=lambda chat_history, **kwargs: chat_history)
+    
+    responses = await asyncio.gather(*[
+        batcher.get_chat_message_content(service, chat_history=f"h{i}")
+        for i in range(3)
+    ])
+    
+    assert batcher.max_wait > 0
+    assert responses == ["h0", "h1", "h2"]
+    assert batcher._dispatch.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_batched_chat_service_resolves_fast_request_first():
+    """Test a fast request returns without waiting for a slow one in its batch"""
+    from src.agents.batched_chat_service import BatchedChatService
+    
+    batcher = BatchedChatService(max_batch=8, max_wait_ms=20)
+    batcher._dispatch = AsyncMock(wraps=batcher._dispatch)
+    finished = []
+    
+    async def reply(chat_history, **kwargs):
+        await asyncio.sleep(0.5 if chat_history == "slow" else 0.01)
+        return chat_history
+    
+    service = Mock()
+    service.get_chat_message_content = reply
+    
+    async def ask(chat_history):
+        response = await batcher.get_chat_message_content(service, chat_history=chat_history)
+        finished.append((response, asyncio.get_running_loop().time()))
+    
+    start = asyncio.get_running_loop().time()
+    await asyncio.gather(ask("slow"), ask("fast"))
+    
+    assert batcher._dispatch.call_count == 1
+    assert [response for response, _ in finished] == ["fast", "slow"]
+    assert finished[0][1] - start < 0.25
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_wait_ms", [0, 5])
+async def test_batched_chat_service_caps_inflight_calls(max_wait_ms):
+    """Test no more than max_inflight calls are outstanding at once"""
+    from src.agents.batched_chat_service import BatchedChatService
+    
+    batcher = BatchedChatService(max_batch=1, max_wait_ms=max_wait_ms, max_inflight=2)
+    active = 0
+    peak = 0
+    
+    async def slow_reply(chat_history, **kwargs):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.05)
+        active -= 1
+        return chat_history
+    
+    service = Mock()
+    service.get_chat_message_content = slow_reply
+    
+    responses = await asyncio.gather(*[
+        batcher.get_chat_message_content(service, chat_history=f"h{i}")
+        for i in range(6)
+    ])
+    
+    assert responses == [f"h{i}" for i in range(6)]
+    assert peak == 2
+    
+    # WHY: Callers resolve before their dispatch task finishes
+    await asyncio.gather(*list(batcher._dispatches))
+    assert not batcher._dispatches
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_wait_ms", [0, 5])
+async def test_batched_chat_service_cancels_upstream_call(max_wait_ms):
+    """Test cancelling a caller cancels its upstream call and frees its slot"""
+    from src.agents.batched_chat_service import BatchedChatService
+    
+    batcher = BatchedChatService(max_batch=1, max_wait_ms=max_wait_ms, max_inflight=1)
+    started = asyncio.Event()
+    upstream_cancelled = asyncio.Event()
+    
+    async def reply(chat_history, **kwargs):
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            upstream_cancelled.set()
+            raise
+        return chat_history
+    
+    service = Mock()
+    service.get_chat_message_content = reply
+    
+    caller = asyncio.create_task(batcher.get_chat_message_content(service, chat_history="slow"))
+    await started.wait()
+    caller.cancel()
+    
+    await asyncio.wait_for(upstream_cancelled.wait(), 1)
+    
+    # WHY: The single inflight slot is free again
+    service.get_chat_message_content = AsyncMock(return_value="next")
+    assert await asyncio.wait_for(batcher.get_chat_message_content(service, chat_history="h"), 1) == "next"
+
+
+@pytest.mark.asyncio
+async def test_batched_chat_service_caps_inflight_streams():
+    """Test streams hold an inflight slot until their last chunk"""
+    from src.agents.batched_chat_service import BatchedChatService
+    
+    batcher = BatchedChatService(max_inflight=2)
+    active = 0
+    peak = 0
+    
+    async def stream_reply(chat_history, **kwargs):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        for token in ("a", "b"):
+            await asyncio.sleep(0.02)
+            yield f"{chat_history}{token}"
+        active -= 1
+    
+    service = Mock()
+    service.get_streaming_chat_message_content = stream_reply
+    
+    async def consume(chat_history):
+        return [
+            chunk async for chunk in
+            batcher.get_streaming_chat_message_content(service, chat_history=chat_history)
+        ]
+    
+    streams = await asyncio.gather(*[consume(f"h{i}") for i in range(5)])
+    
+    assert streams == [[f"h{i}a", f"h{i}b"] for i in range(5)]
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_tool_executor_overlaps_blocking_calls():
+    """Test blocking tool calls run concurrently in the executor"""
+    import time
+    from src.agents.tool_executor import ParallelToolExecutor
+    
+    executor = ParallelToolExecutor(max_workers=4)
+    
+    def slow_tool(value):
+        time.sleep(0.2)
+        return value
+    
+    start = time.perf_counter()
+    results = await asyncio.gather(*[executor.run(slow_tool, i) for i in range(4)])
+    elapsed = time.perf_counter() - start
+    executor.shutdown()
+    
+    assert results == [0, 1, 2, 3]
+    assert elapsed < 0.6  # WHY: Serial execution would take 0.8s
+
+
+def test_trim_chat_messages_cuts_before_user_message():
+    """Test history trimming drops a block of old messages at a user turn"""
+    from types import SimpleNamespace
+    from src.agents.base_agent import trim_chat_messages
+    
+    roles = ["user", "assistant", "tool", "assistant"] * 3
+    messages = [SimpleNamespace(role=role, i=i) for i, role in enumerate(roles)]
+    
+    assert trim_chat_messages(messages, max_messages=12) == 0
+    
+    messages.append(SimpleNamespace(role="user", i=12))
+    removed = trim_chat_messages(messages, max_messages=12)
+    
+    assert removed == 8
+    assert messages[0].role == "user"
+    assert [m.i for m in messages] == [8, 9, 10, 11, 12]
+
+
+def test_session_cache_evicts_lru_and_idle_sessions():
+    """Test session cache bounds size and expires idle sessions"""
+    import time
+    from src.agents.session_cache import SessionCache
+    
+    evicted = []
+    cache = SessionCache(maxsize=2, ttl=0.05, on_evict=evicted.append)
+    
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # WHY: "b" is now least recently used
+    cache.put("c", 3)
+    
+    assert evicted == [2]
+    assert "b" not in cache
+    assert len(cache) == 2
+    
+    time.sleep(0.06)
+    assert len(cache) == 0
+    assert sorted(evicted) == [1, 2, 3]
+    
+    cache.put("d", 4)
+    assert cache.pop("d") == 4
+    assert len(evicted) == 3  # WHY: pop() does not count as an eviction
+
+
 # ============================================
 # API TESTS
 # ============================================
@@ -238,6 +613,35 @@ async def test_api_process_task():
             assert data["response"] == "Test response"
 
 
+@pytest.mark.asyncio
+async def test_api_stream_task():
+    """Test streaming endpoint returns the agent's SSE frames"""
+    from httpx import AsyncClient
+    from src.app import app
+    
+    async def fake_stream(task):
+        yield 'data: "Hello"\n\n'
+        yield 'data: " world"\n\n'
+        yield 'event: done\ndata: {}\n\n'
+    
+    with patch('src.app.BaseAgent') as mock_agent_class:
+        mock_agent = Mock()
+        mock_agent.stream_task = fake_stream
+        mock_agent_class.return_value = mock_agent
+        
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.post(
+                "/agent/task/stream",
+                json={"task": "Test task", "session_id": "stream-session"}
+            )
+            
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/event-stream")
+            assert response.headers["x-session-id"] == "stream-session"
+            assert 'data: "Hello"' in response.text
+            assert "event: done" in response.text
+
+
 @pytest.mark.asyncio
 async def test_api_health_check():
     """Test health check endpoint"""
@@ -253,6 +657,40 @@ async def test_api_health_check():
         assert "active_sessions" in data
 
 
+@pytest.mark.asyncio
+async def test_api_uncached_session_uses_shared_memory():
+    """Test history and delete serve uncached sessions without building agents"""
+    from httpx import AsyncClient
+    from src.app import app, active_agents
+    
+    memory = Mock()
+    memory.get_conversation_history = Mock(
+        side_effect=lambda session_id: [{"role": "user", "content": "Earlier task"}] if session_id == "evicted-session" else []
+    )
+    memory.has_messages = Mock(side_effect=lambda session_id: session_id == "evicted-session")
+    
+    with patch('src.app.BaseAgent') as mock_agent_class, \
+         patch('src.app.get_session_memory', return_value=memory):
+        
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            history_response = await client.get("/session/evicted-session/history")
+            assert history_response.status_code == 200
+            assert len(history_response.json()["messages"]) == 1
+            
+            missing_response = await client.get("/session/unknown-session/history")
+            assert missing_response.status_code == 404
+            
+            delete_response = await client.delete("/session/evicted-session")
+            assert delete_response.status_code == 200
+            memory.clear_session.assert_called_once_with("evicted-session")
+            
+            missing_delete = await client.delete("/session/unknown-session")
+            assert missing_delete.status_code == 404
+        
+        assert not mock_agent_class.called
+        assert active_agents.get("evicted-session") is None
+
+
 # ============================================
 # INTEGRATION TESTS
 # ============================================